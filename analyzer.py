@@ -1,16 +1,28 @@
+import hashlib
+import json
 import math
+import os
+import re
+from dataclasses import replace
 import numpy as np
 import pandas as pd
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, html, dcc, Input, Output, State, dash_table
+from dash import ClientsideFunction, Dash, ctx, html, dcc, Input, Output, State, dash_table
 import dash_bootstrap_components as dbc
-import glob
-import os
 from rag_generator import BlindSpotRAG
+from bootstrap import (
+    DEFAULT_CORRECTION, DEFAULT_ITERATIONS, DEFAULT_SEED, EXACT_PERMUTATION_LIMIT,
+    adjust_pvalues, bootstrap_column_diffs, bootstrap_diff, pairwise_bootstrap,
+    result_cache as bootstrap_cache,
+)
+from caching import DiskCache, LRUCache, TieredCache, normalize_selection
+from snapshot import DEFAULT_RELOAD_INTERVAL, DatasetStore
+from trends import company_trends, interval_movers, multi_year
 import base64
 import io
-from flask import send_file
+from flask import jsonify, send_file
 import uuid
 
 # App configuration
@@ -291,154 +303,6 @@ app.index_string = """
 </html>
 """
 
-# ---------------------
-# Data loader
-# ---------------------
-def load_data(file_patterns=None):
-    companies = []
-    kpi_definitions = []
-    files = []
-
-    base_dir = os.path.join(os.path.dirname(__file__), "datasets")
-    if file_patterns is None:
-        if os.path.isdir(base_dir):
-            file_patterns = [
-                os.path.join(base_dir, "quotate", "*.xlsx"),
-                os.path.join(base_dir, "non_quotate", "*.xlsx"),
-            ]
-        else:
-            file_patterns = ["QUOTATE*.xlsx", "*NON-QUOTATE*.xlsx"]
-
-    for pattern in file_patterns:
-        files.extend(sorted(glob.glob(pattern)))
-    if not files:
-        fallback_files = [
-            os.path.join(base_dir, "quotate", "QUOTATE-KPI-OSS.xlsx"),
-            os.path.join(base_dir, "non_quotate", "NON-QUOTATE-KPI-OSS.xlsx"),
-            "QUOTATE-KPI-OSS.xlsx",
-            "NON-QUOTATE-KPI-OSS.xlsx",
-        ]
-        files = [f for f in fallback_files if os.path.exists(f)]
-    files = list(dict.fromkeys(files))  # dedupe while preserving order
-
-    for file_path in files:
-        if not os.path.exists(file_path):
-            continue
-        try:
-            xls = pd.ExcelFile(file_path)
-            sheet_names = xls.sheet_names
-            source_type = "Quotate" if "NON" not in file_path.upper() else "Non-Quotate"
-            for sheet_name in sheet_names:
-                df_raw = pd.read_excel(file_path, sheet_name=sheet_name, header=None)
-                headers = df_raw.iloc[1]
-                sectors = df_raw.iloc[0]
-                year = None
-                try:
-                    year_cell = df_raw.iloc[0, 1]
-                    if pd.notna(year_cell):
-                        year = int(year_cell)
-                except:
-                    year = None
-                current_sector = "Unknown"
-                col_idx = 3
-                while col_idx < df_raw.shape[1]:
-                    sec_cell = sectors[col_idx]
-                    if pd.notna(sec_cell) and str(sec_cell).strip() != "":
-                        current_sector = str(sec_cell).strip()
-                    col_name = str(headers[col_idx]).strip()
-                    if col_name and col_name.upper() != "OSS" and col_name.lower() != "nan":
-                        company_name = col_name
-                        oss_col_idx = col_idx + 1
-                        company_kpi_values = {}
-                        company_total_oss = 0
-                        company_missing_count = 0
-                        # iterate KPI rows
-                        last_valid_cat = "Unknown"
-                        for r in range(2, df_raw.shape[0]):
-                            cat = df_raw.iloc[r, 0]
-                            kpi_name = df_raw.iloc[r, 1]
-                            weight = df_raw.iloc[r, 2]
-                            if pd.notna(cat) and str(cat).strip().lower() == "totale":
-                                break
-                            if pd.isna(kpi_name) or str(kpi_name).strip() == "":
-                                continue
-                            if pd.isna(cat) or str(cat).strip() == "":
-                                cat = last_valid_cat
-                            else:
-                                last_valid_cat = str(cat).strip()
-                                cat = last_valid_cat
-                            kpi_id = f"{cat}|{kpi_name}"
-                            val_cell = df_raw.iloc[r, col_idx]
-                            oss_cell = df_raw.iloc[r, oss_col_idx] if oss_col_idx < df_raw.shape[1] else None
-                            is_missing = 1 if (pd.notna(val_cell) and str(val_cell).strip() == "1") else 0
-                            try:
-                                oss_score = float(oss_cell) if pd.notna(oss_cell) else 0
-                            except:
-                                oss_score = 0
-                            company_kpi_values[kpi_id] = {"value": is_missing, "oss": oss_score}
-                            company_total_oss += oss_score
-                            if is_missing:
-                                company_missing_count += 1
-                        companies.append({
-                            "Company": company_name,
-                            "Sector": current_sector,
-                            "Type": source_type,
-                            "Year": year,
-                            "Total_Missing_KPIs": company_missing_count,
-                            "Total_OSS_Score": company_total_oss,
-                            "kpi_data": company_kpi_values
-                        })
-                        col_idx += 2
-                    else:
-                        col_idx += 1
-                # build kpi_definitions from first sheet encountered (if not present)
-                if not kpi_definitions:
-                    last_valid_cat = "Unknown"
-                    for r in range(2, df_raw.shape[0]):
-                        cat = df_raw.iloc[r, 0]
-                        kpi_name = df_raw.iloc[r, 1]
-                        weight = df_raw.iloc[r, 2]
-                        if pd.notna(cat) and str(cat).strip().lower() == "totale":
-                            break
-                        if pd.isna(kpi_name) or str(kpi_name).strip() == "":
-                            continue
-                        if pd.isna(cat) or str(cat).strip() == "":
-                            cat = last_valid_cat
-                        else:
-                            last_valid_cat = str(cat).strip()
-                            cat = last_valid_cat
-                        kpi_definitions.append({
-                            "Category": cat,
-                            "KPI": str(kpi_name).strip(),
-                            "Weight": float(weight) if pd.notna(weight) else 0,
-                            "ID": f"{cat}|{kpi_name}"
-                        })
-        except Exception as e:
-            print(f"Error processing file {file_path}: {e}")
-
-    df_companies = pd.DataFrame(companies)
-    df_kpi_defs = pd.DataFrame(kpi_definitions)
-    if not df_companies.empty and not df_kpi_defs.empty:
-        total_kpis = len(df_kpi_defs)
-        df_companies["Transparency_Percentage"] = (df_companies["Total_Missing_KPIs"] / total_kpis * 100).round(2)
-        df_companies["Present_Percentage"] = (100 - df_companies["Transparency_Percentage"]).round(2)
-        full_kpi_rows = []
-        for _, def_row in df_kpi_defs.iterrows():
-            row_item = {"Category": def_row["Category"], "KPI": def_row["KPI"], "Weight": def_row["Weight"], "ID": def_row["ID"]}
-            kpi_id = def_row["ID"]
-            for _, comp_row in df_companies.iterrows():
-                comp_data = comp_row["kpi_data"].get(kpi_id, {"value": 0, "oss": 0})
-                row_item[f"{comp_row['Company']}_value"] = comp_data["value"]
-                row_item[f"{comp_row['Company']}_oss"] = comp_data["oss"]
-            full_kpi_rows.append(row_item)
-        df_kpis = pd.DataFrame(full_kpi_rows)
-        df_companies = df_companies.drop(columns=["kpi_data"])
-        df_companies = df_companies.drop_duplicates(subset=["Company", "Sector", "Type", "Year"], keep="first")
-        return df_companies, df_kpis
-    return pd.DataFrame(), pd.DataFrame()
-
-companies_df, kpi_df = load_data()
-
 # ---------------------
 # Severity logic & helpers
 # ---------------------
@@ -452,9 +316,200 @@ def get_oss_severity(score):
     if score <= 155: return "Critica"
     return "Estrema"
 
-if not companies_df.empty:
-    companies_df["Severity"] = companies_df["Total_OSS_Score"].apply(get_oss_severity)
-    companies_df = companies_df.sort_values("Total_OSS_Score")
+SEVERITY_LEVELS = ["N/A", "Trasparente", "Bassa", "Moderata", "Grave", "Critica", "Estrema"]
+
+def prepare_dataset(data):
+    """Add the Severity band and OSS ordering the callbacks expect to a freshly loaded dataset."""
+    companies = data.companies
+    if companies.empty:
+        return data
+    severity = companies["Total_OSS_Score"].apply(get_oss_severity)
+    companies = companies.assign(Severity=pd.Categorical(severity, categories=SEVERITY_LEVELS))
+    return replace(data, companies=companies.sort_values("Total_OSS_Score"))
+
+def filter_companies(data, years=None, types=None, sectors=None, companies=None, severities=None):
+    """Rows of the snapshot's companies table matching the sidebar filters (an empty filter keeps everything)."""
+    rows = data.index.rows({
+        "Year": years, "Type": types, "Sector": sectors, "Company": companies, "Severity": severities,
+    })
+    return data.companies.iloc[rows]
+
+def sort_companies(df, sortby):
+    if sortby == "severity-asc":
+        return df.sort_values(["Total_OSS_Score", "Company"], ascending=[True, True])
+    if sortby == "severity-desc":
+        return df.sort_values(["Total_OSS_Score", "Company"], ascending=[False, True])
+    if sortby == "company-az":
+        return df.sort_values("Company", ascending=True)
+    if sortby == "company-za":
+        return df.sort_values("Company", ascending=False)
+    return df
+
+# Filtered views keyed by snapshot version + normalized filters + sortby; see /cache-stats.
+view_cache = LRUCache(int(os.environ.get("BLINDSPOT_VIEW_CACHE_SIZE", "64")), name="filtered-views")
+
+# Rendered tab contents as component JSON, one cache per tab view, keyed by dataset
+# contents + filters + sortby. BLINDSPOT_FIGURE_CACHE_DIR adds a disk tier (one
+# subdirectory per tab) that every worker process shares.
+_token = hashlib.sha1()
+for _module in ("analyzer.py", "bootstrap.py", "data_loader.py", "dataset.py", "trends.py"):
+    # Entries written by a different version of these modules are never reused.
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), _module), "rb") as _source:
+        _token.update(_source.read())
+# Nor are entries rendered under different statistics settings.
+_token.update(repr((DEFAULT_ITERATIONS, DEFAULT_SEED, EXACT_PERMUTATION_LIMIT, DEFAULT_CORRECTION)).encode())
+FIGURE_CACHE_TOKEN = _token.hexdigest()[:12]
+FIGURE_CACHE_BYTES = int(float(os.environ.get("BLINDSPOT_FIGURE_CACHE_MB", "8")) * 2**20)
+FIGURE_CACHE_DIR = os.environ.get("BLINDSPOT_FIGURE_CACHE_DIR")
+FIGURE_CACHE_DISK_BYTES = int(float(os.environ.get("BLINDSPOT_FIGURE_CACHE_DISK_MB", "64")) * 2**20)
+figure_caches = {}
+
+def tab_figure_cache(tab):
+    return TieredCache(
+        LRUCache(maxsize=512, name=f"figures-{tab}", maxbytes=FIGURE_CACHE_BYTES),
+        DiskCache(os.path.join(FIGURE_CACHE_DIR, tab), maxbytes=FIGURE_CACHE_DISK_BYTES, name=f"figures-disk-{tab}")
+        if FIGURE_CACHE_DIR else None,
+    )
+
+def filtered_view(data, years=None, types=None, sectors=None, companies=None, severities=None, sortby=None):
+    """``filter_companies`` + ``sort_companies`` through the LRU view cache.
+
+    Callers get a copy-on-write shallow copy of the cached frame: reading is
+    free and any change they make lands in their own copy, never in the cache.
+    """
+    key = (
+        data.version, normalize_selection(years), normalize_selection(types), normalize_selection(sectors),
+        normalize_selection(companies), normalize_selection(severities), sortby,
+    )
+    view = view_cache.get_or_compute(
+        key, lambda: sort_companies(filter_companies(data, years, types, sectors, companies, severities), sortby)
+    )
+    return view.copy(deep=False)
+
+# ---------------------
+# Data table paging
+# ---------------------
+# The Data Table tab pages, sorts and filters on the server (page_action/sort_action/
+# filter_action="custom"): only the visible page is serialized.
+TABLE_COLUMNS = ["Company", "Sector", "Type", "Year", "Total_OSS_Score", "Severity", "Total_Missing_KPIs",
+                 "Transparency_Percentage", "Present_Percentage"]
+TABLE_NUMERIC = ["Total_OSS_Score", "Total_Missing_KPIs", "Transparency_Percentage", "Present_Percentage"]
+# Stored as float32 (see dataset.COMPANY_SCHEMA); widened and rounded before JSON export.
+SCORE_COLUMNS = ["Total_OSS_Score", "Transparency_Percentage", "Present_Percentage"]
+TABLE_PAGE_SIZE = 12
+# Columns the FilterIndex can resolve "=" terms on without scanning rows.
+TABLE_INDEXED = {"Company", "Sector", "Type", "Year", "Severity"}
+# Row orders (positions into companies) keyed by snapshot + filters + sort + filter_query.
+table_order_cache = LRUCache(int(os.environ.get("BLINDSPOT_TABLE_CACHE_SIZE", "32")), name="data-table-orders")
+
+# "{column} op value" as written by the DataTable filter row; "i"/"s" prefixes pick case (in)sensitivity.
+_FILTER_TERM = re.compile(
+    r"^\{(?P<column>[^}]+)\}\s+(?P<case>[is]?)(?P<op>>=|<=|!=|<|>|=|eq|ne|lt|le|gt|ge|contains|datestartswith)\s+(?P<value>.*)$"
+)
+_FILTER_OPS = {"eq": "=", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+def parse_filter_query(query):
+    """``(column, op, value, case_insensitive)`` terms of a DataTable ``filter_query``; unparseable terms are skipped."""
+    terms = []
+    for part in (query or "").split(" && "):
+        match = _FILTER_TERM.match(part.strip())
+        if not match:
+            continue
+        value = match["value"].strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'`":
+            value = value[1:-1]
+        op = _FILTER_OPS.get(match["op"], match["op"])
+        terms.append((match["column"], op, value, match["case"] == "i"))
+    return terms
+
+def _term_mask(series, op, value, case_insensitive):
+    if op in ("contains", "datestartswith"):
+        text = series.astype(str)
+        if case_insensitive:
+            text, value = text.str.lower(), value.lower()
+        return (text.str.contains(value, regex=False) if op == "contains" else text.str.startswith(value)).to_numpy()
+    if pd.api.types.is_numeric_dtype(series):
+        number = pd.to_numeric(value, errors="coerce")
+        if pd.isna(number):
+            return np.full(len(series), op == "!=")
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    else:
+        values, number = series.astype(str).to_numpy(), value
+        if case_insensitive:
+            values, number = np.char.lower(values.astype(str)), value.lower()
+    return {"=": np.equal, "!=": np.not_equal, "<": np.less, "<=": np.less_equal,
+            ">": np.greater, ">=": np.greater_equal}[op](values, number)
+
+def table_order(data, years=None, types=None, sectors=None, companies=None, severities=None, sortby=None,
+                filter_query=None, sort_by=None):
+    """Positions into ``data.companies`` of the Data Table rows, in display order (cached).
+
+    Sidebar filters and case-sensitive ``=`` terms on indexed columns are one
+    FilterIndex lookup; other ``filter_query`` terms are vectorized masks over
+    those rows. The sidebar Sort By gives the base order and a column sort
+    from the table is applied on top of it (stable).
+    """
+    sort_by = tuple((s["column_id"], s["direction"]) for s in sort_by or ())
+    key = (
+        data.version, normalize_selection(years), normalize_selection(types), normalize_selection(sectors),
+        normalize_selection(companies), normalize_selection(severities), sortby, filter_query or "", sort_by,
+    )
+
+    def compute():
+        selections = {"Year": years, "Type": types, "Sector": sectors, "Company": companies, "Severity": severities}
+        masks = []
+        for column, op, value, case_insensitive in parse_filter_query(filter_query):
+            if column not in TABLE_COLUMNS:
+                continue
+            if op == "=" and column in TABLE_INDEXED and not case_insensitive:
+                known = data.index.values(column)
+                matches = [v for v in known[known.astype(str) == value] if not selections[column] or v in selections[column]]
+                if not matches:
+                    return np.empty(0, dtype=np.int64)
+                selections[column] = matches
+            else:
+                masks.append((column, op, value, case_insensitive))
+
+        rows = data.index.rows(selections)
+        view = data.companies.iloc[rows].reset_index(drop=True)
+        order = sort_companies(view, sortby).index.to_numpy()
+        if masks:
+            keep = np.ones(len(view), dtype=bool)
+            for column, op, value, case_insensitive in masks:
+                keep &= _term_mask(view[column], op, value, case_insensitive)
+            order = order[keep[order]]
+        for column, direction in reversed(sort_by):
+            if column in TABLE_COLUMNS:
+                order = view[column].iloc[order].sort_values(ascending=direction == "asc", kind="stable").index.to_numpy()
+        return rows[order]
+
+    return table_order_cache.get_or_compute(key, compute)
+
+def json_scores(frame):
+    """``frame`` with its float32 ``SCORE_COLUMNS`` as float64 rounded to 2 decimals.
+
+    float32 values widen to float64 with noise in the last digits (12.3 becomes
+    12.300000190734863), which would otherwise reach the browser as-is.
+    """
+    columns = [column for column in SCORE_COLUMNS if column in frame]
+    return frame.astype(dict.fromkeys(columns, np.float64)).round(dict.fromkeys(columns, 2))
+
+
+def table_page(data, positions):
+    """Display records for ``positions``: missing values, and zeros in score columns, shown as "N/A"."""
+    page = data.companies.iloc[positions][TABLE_COLUMNS]
+    display = json_scores(page).astype(object).where(page.notna(), "N/A")
+    for column in TABLE_NUMERIC:
+        display[column] = display[column].mask(page[column] == 0, "N/A")
+    return display.to_dict("records")
+
+# ---------------------
+# Data
+# ---------------------
+# Callbacks read ``store.current()`` once per request; changed workbooks are
+# picked up by the watcher and swapped in without a restart. The first request
+# loads the data and starts the watcher, so importing this module does neither.
+store = DatasetStore(prepare=prepare_dataset, watch_interval=DEFAULT_RELOAD_INTERVAL)
 
 severity_colors = {
     "Trasparente": "#27ae60",
@@ -464,6 +519,7 @@ severity_colors = {
     "Critica": "#e74c3c",
     "Estrema": "#6c3483"
 }
+px.defaults.template = "plotly_white"
 
 def polish_figure(fig, height=600, margin=None):
     base_margin = {"t": 60, "b": 80, "l": 60, "r": 30}
@@ -482,21 +538,35 @@ def polish_figure(fig, height=600, margin=None):
     return fig
 
 # ---------------------
-# Bootstrap helper
+# Significance heatmaps
 # ---------------------
-def bootstrap_diff(a, b, iterations=3000):
-    if len(a) == 0 or len(b) == 0:
-        return None
-    a = np.asarray(a, dtype=float)
-    b = np.asarray(b, dtype=float)
-    diffs = np.empty(iterations)
-    for i in range(iterations):
-        sa = np.random.choice(a, size=len(a), replace=True)
-        sb = np.random.choice(b, size=len(b), replace=True)
-        diffs[i] = sa.mean() - sb.mean()
-    ci_low, ci_high = np.percentile(diffs, [2.5, 97.5])
-    p_two = 2 * min((diffs >= 0).mean(), (diffs <= 0).mean())
-    return {"diff_mean": diffs.mean(), "ci_low": ci_low, "ci_high": ci_high, "p_value": p_two}
+def pairwise_heatmap(pairs, labels, title):
+    """Heatmap of ``pairwise_bootstrap`` rows: cell (row, col) is mean(row) - mean(col), starred when significant."""
+    position = {label: i for i, label in enumerate(labels)}
+    size = len(labels)
+    diff = np.full((size, size), np.nan)
+    custom = np.full((size, size, 3), np.nan)
+    marks = np.full((size, size), "", dtype=object)
+    i = pairs["A"].map(position).to_numpy()
+    j = pairs["B"].map(position).to_numpy()
+    diff[i, j] = pairs["diff_mean"]
+    diff[j, i] = -pairs["diff_mean"]
+    custom[i, j] = pairs[["ci_low", "ci_high", "p_adjusted"]].to_numpy()
+    custom[j, i] = np.column_stack([-pairs["ci_high"], -pairs["ci_low"], pairs["p_adjusted"]])
+    marks[i, j] = marks[j, i] = np.where(pairs["significant"], "*", "")
+    names = [str(label) for label in labels]
+    bound = np.nanmax(np.abs(diff)) if np.isfinite(diff).any() else 1.0
+    fig = go.Figure(go.Heatmap(
+        z=diff, x=names, y=names, text=marks, texttemplate="%{text}", customdata=custom,
+        colorscale="RdBu_r", zmin=-bound, zmax=bound, colorbar=dict(title="Δ mean OSS"),
+        hovertemplate="<b>%{y} − %{x}</b><br>Δ mean OSS: %{z:.2f}"
+                      "<br>95% CI: [%{customdata[0]:.2f}, %{customdata[1]:.2f}]"
+                      "<br>Adjusted p: %{customdata[2]:.3f}<extra></extra>",
+    ))
+    fig.update_layout(title=title)
+    fig.update_xaxes(type="category")
+    fig.update_yaxes(type="category", autorange="reversed")
+    return polish_figure(fig, height=max(420, 60 + 36 * size), margin={"t": 70, "b": 120, "l": 160})
 
 # ---------------------
 # UI components
@@ -506,23 +576,23 @@ header = dbc.Row([dbc.Col(html.Div([html.H2("The Blind Spot", className="header-
 def metric(title, value, sub):
     return dbc.Card(dbc.CardBody([html.Div(title, className="metric-title"), html.Div(value, className="metric-value"), html.Div(sub, className="metric-subtext")]), className="elegant-card")
 
-metrics = dbc.Row([
-    dbc.Col(metric("Companies", int(companies_df['Company'].nunique()) if not companies_df.empty else 0, "Unique companies analyzed"), md=3),
-    dbc.Col(metric("KPIs", len(kpi_df) if kpi_df is not None else 0, "Tracked indicators"), md=3),
-    dbc.Col(metric("Max OSS", "185", "Upper bound of scale"), md=3),
-    dbc.Col(metric("Average OSS", f"{companies_df['Total_OSS_Score'].mean():.1f}" if not companies_df.empty else "0", "Across dataset"), md=3)
-], className="mb-4")
-
-if not companies_df.empty:
-    sector_options = [{"label": s, "value": s} for s in sorted(companies_df["Sector"].unique())]
-    severity_options = [{"label": k, "value": k} for k in severity_colors]
-    year_options = [{"label": str(y), "value": y} for y in sorted(companies_df["Year"].unique())]
-    type_options = [{"label": t, "value": t} for t in sorted(companies_df["Type"].unique())]
-else:
-    sector_options = []
-    severity_options = []
-    year_options = []
-    type_options = []
+def build_metrics(companies_df, kpi_df):
+    return dbc.Row([
+        dbc.Col(metric("Companies", int(companies_df['Company'].nunique()) if not companies_df.empty else 0, "Unique companies analyzed"), md=3),
+        dbc.Col(metric("KPIs", len(kpi_df) if kpi_df is not None else 0, "Tracked indicators"), md=3),
+        dbc.Col(metric("Max OSS", "185", "Upper bound of scale"), md=3),
+        dbc.Col(metric("Average OSS", f"{companies_df['Total_OSS_Score'].mean():.1f}" if not companies_df.empty else "0", "Across dataset"), md=3)
+    ], className="mb-4")
+
+def filter_options(companies_df):
+    if companies_df.empty:
+        return {"sector": [], "severity": [], "year": [], "type": []}
+    return {
+        "sector": [{"label": s, "value": s} for s in sorted(companies_df["Sector"].unique())],
+        "severity": [{"label": k, "value": k} for k in severity_colors],
+        "year": [{"label": str(y), "value": y} for y in sorted(companies_df["Year"].dropna().unique())],
+        "type": [{"label": t, "value": t} for t in sorted(companies_df["Type"].unique())],
+    }
 
 download_button = dbc.Card(dbc.CardBody([
     html.Div("Export Report", style={"fontWeight": "700", "marginBottom": "16px"}),
@@ -548,47 +618,60 @@ download_report_section = html.Div([
     )
 ])
 
-controls = dbc.Card(dbc.CardBody([
-    html.Div("Refine Results", style={"fontWeight": "700", "marginBottom": "16px"}),
-    html.Label("Year"), dcc.Dropdown(id="year-filter", options=year_options, value=[], multi=True), html.Br(),
-    html.Label("Type"), dcc.Dropdown(id="type-filter", options=type_options, value=[], multi=True), html.Br(),
-    html.Label("Sector"), dcc.Dropdown(id="sector-filter", options=sector_options, value=[], multi=True), html.Br(),
-    html.Label("Severity"), dcc.Dropdown(id="severity-filter", options=severity_options, value=[], multi=True), html.Br(),
-    html.Label("Company"), dcc.Dropdown(id="company-filter", options=[], value=[], multi=True), html.Br(),
-    html.Label("Sort By"),
-    dcc.Dropdown(id="sortby-filter", options=[
-        {"label": "Severity Ascending", "value": "severity-asc"},
-        {"label": "Severity Descending", "value": "severity-desc"},
-        {"label": "Company A-Z", "value": "company-az"},
-        {"label": "Company Z-A", "value": "company-za"},
-    ], value="severity-asc", clearable=False),
-    html.Br(),
-    dbc.Button("Reset Filters", id="reset-btn", color="primary", className="w-100"),
-    html.Div(id="reset-trigger", style={"display": "none"}),
-    download_report_section  
-]), className="control-card")
+def build_controls(options):
+    return dbc.Card(dbc.CardBody([
+        html.Div("Refine Results", style={"fontWeight": "700", "marginBottom": "16px"}),
+        html.Label("Year"), dcc.Dropdown(id="year-filter", options=options["year"], value=[], multi=True), html.Br(),
+        html.Label("Type"), dcc.Dropdown(id="type-filter", options=options["type"], value=[], multi=True), html.Br(),
+        html.Label("Sector"), dcc.Dropdown(id="sector-filter", options=options["sector"], value=[], multi=True), html.Br(),
+        html.Label("Severity"), dcc.Dropdown(id="severity-filter", options=options["severity"], value=[], multi=True), html.Br(),
+        html.Label("Company"), dcc.Dropdown(id="company-filter", options=[], value=[], multi=True), html.Br(),
+        html.Label("Sort By"),
+        dcc.Dropdown(id="sortby-filter", options=[
+            {"label": "Severity Ascending", "value": "severity-asc"},
+            {"label": "Severity Descending", "value": "severity-desc"},
+            {"label": "Company A-Z", "value": "company-az"},
+            {"label": "Company Z-A", "value": "company-za"},
+        ], value="severity-asc", clearable=False),
+        html.Br(),
+        dbc.Button("Reset Filters", id="reset-btn", color="primary", className="w-100"),
+        html.Div(id="reset-trigger", style={"display": "none"}),
+        download_report_section  
+    ]), className="control-card")
 
 tabs = dcc.Tabs(id="main-tabs", value="tab-about", className="dash-tabs", children=[
     dcc.Tab(label="About", value="tab-about"),
     dcc.Tab(label="Overview (OSS)", value="tab-oss"),
     dcc.Tab(label="Quotate Gap", value="tab-gap"),
+    dcc.Tab(label="Pairwise Significance", value="tab-pairwise"),
     dcc.Tab(label="Severity Analysis", value="tab-severity"),
     dcc.Tab(label="Sector Comparison", value="tab-sector"),
     dcc.Tab(label="Trend Analysis", value="tab-trends"),
     dcc.Tab(label="KPI Breakdown", value="tab-kpi-breakdown"),
     dcc.Tab(label="KPI Radar", value="tab-radar"),
-    
+    dcc.Tab(label="Category Impact", value="tab-cat-impact"),
     dcc.Tab(label="Data Table", value="tab-data"),
     
     dcc.Tab(label="💬 AI Chat", value="tab-chat"),
 ])
-# dcc.Tab(label="Category Impact", value="tab-cat-impact"),
 
-main_display = dbc.Card(dbc.CardBody([tabs, html.Div(id="tab-content", className="mt-3")]), className="elegant-card")
+DEFAULT_FILTERS = {"years": [], "types": [], "sectors": [], "companies": [], "severities": []}
+
+main_display = dbc.Card(dbc.CardBody([
+    tabs,
+    dcc.Store(id="filter-state", data=DEFAULT_FILTERS),
+    html.Div(id="tab-content", className="mt-3"),
+]), className="elegant-card")
 
 footer = html.Div([html.Div("The Blind Spot — Analysis framework for gender-related reporting transparency."), html.Img(src="/assets/team=logo.png", style={"height": "69px", "marginTop": "10px", "filter": "grayscale(0.2)", "opacity": 0.9}, alt="Ingenium Logo")], className="footer-note")
 
-app.layout = dbc.Container([header, metrics, dbc.Row([dbc.Col(controls, md=3, className="mb-3"), dbc.Col(main_display, md=9)]), footer], fluid=True, className="p-4")
+def serve_layout():
+    # Built per page load, so headline metrics and filter options follow the current snapshot.
+    data = store.current()
+    controls = build_controls(filter_options(data.companies))
+    return dbc.Container([header, build_metrics(data.companies, data.kpis), dbc.Row([dbc.Col(controls, md=3, className="mb-3"), dbc.Col(main_display, md=9)]), footer], fluid=True, className="p-4")
+
+app.layout = serve_layout
 
 # ---------------------
 # Callbacks
@@ -602,931 +685,1047 @@ app.layout = dbc.Container([header, metrics, dbc.Row([dbc.Col(controls, md=3, cl
     Input("reset-trigger", "children")
 )
 def update_company_list(years, types, sectors, severities, _):
-    if companies_df.empty:
+    data = store.current()
+    if data.companies.empty:
         return []
-    df = companies_df.copy()
-    if years:
-        df = df[df["Year"].isin(years)]
-    if types:
-        df = df[df["Type"].isin(types)]
-    if sectors:
-        df = df[df["Sector"].isin(sectors)]
-    if severities:
-        df = df[df["Severity"].isin(severities)]
+    df = filtered_view(data, years, types, sectors, severities=severities)
     return [{"label": c, "value": c} for c in sorted(df["Company"].unique())]
 
-@app.callback(
-    Output("tab-content", "children"),
-    Input("main-tabs", "value"),
+# Filters are bundled in the browser (assets/clientside.js), so every tab view
+# depends on a single input; Sort By is passed separately to the views that sort.
+app.clientside_callback(
+    ClientsideFunction(namespace="blindspot", function_name="filterState"),
+    Output("filter-state", "data"),
     Input("year-filter", "value"),
     Input("type-filter", "value"),
     Input("sector-filter", "value"),
     Input("company-filter", "value"),
-    Input("severity-filter", "value"),
-    Input("sortby-filter", "value")
+    Input("severity-filter", "value")
 )
-def render_tab(tab, years, types, sectors, companies, severities, sortby):
-    if companies_df.empty:
-        return html.Div("No data loaded. Please ensure Excel files are present.", className="p-3 text-muted")
-
-    df = companies_df.copy()
-    if years:
-        df = df[df["Year"].isin(years)]
-    if types:
-        df = df[df["Type"].isin(types)]
-    if sectors:
-        df = df[df["Sector"].isin(sectors)]
-    if companies:
-        df = df[df["Company"].isin(companies)]
-    if severities:
-        df = df[df["Severity"].isin(severities)]
-
-    if df.empty:
-        return html.Div("No companies match the selected filters.", style={"color": "#777"})
-
-    # Sorting
-    if sortby == "severity-asc":
-        df = df.sort_values(["Total_OSS_Score", "Company"], ascending=[True, True])
-    elif sortby == "severity-desc":
-        df = df.sort_values(["Total_OSS_Score", "Company"], ascending=[False, True])
-    elif sortby == "company-az":
-        df = df.sort_values("Company", ascending=True)
-    elif sortby == "company-za":
-        df = df.sort_values("Company", ascending=False)
-
-    px.defaults.template = "plotly_white"
-
-    # TAB 1
-    if tab == "tab-oss":
-        fig = px.bar(df, x="Company", y="Total_OSS_Score", color="Severity", color_discrete_map=severity_colors,
-                     hover_data=["Sector", "Type", "Year"], title="OSS Score Distribution (Lower = More Transparent)", text="Total_OSS_Score")
-        fig.update_traces(textposition="outside", marker_line_width=0, marker=dict(opacity=0.92))
-        fig.update_layout(xaxis_tickangle=-45)
-        fig = polish_figure(fig, height=620, margin={"t": 70, "b": 160})
-        return dcc.Graph(figure=fig, config={"displayModeBar": False})
-
-    # TAB 2
-    if tab == "tab-severity":
-        counts = df["Severity"].value_counts().reset_index()
-        counts.columns = ["Severity", "Count"]
-        pie = px.pie(counts, names="Severity", values="Count", hole=0.4, color="Severity", color_discrete_map=severity_colors,
-                     title="Distribution of Severity Levels")
-        pie.update_traces(textinfo="percent+label", pull=[0.03]*len(counts))
-        pie = polish_figure(pie, height=560, margin={"t": 60, "b": 40})
-        return dcc.Graph(figure=pie, config={"displayModeBar": False})
-
-    # TAB 3
-    if tab == "tab-sector":
-        sector_order = df.groupby("Sector")["Total_OSS_Score"].median().sort_values().index.tolist()
-        if df["Sector"].nunique() > 1:
-            box = px.box(df, x="Sector", y="Total_OSS_Score", points="all", color="Severity",
-                         color_discrete_map=severity_colors, category_orders={"Sector": sector_order},
-                         title="OSS Score Variation by Sector")
-            box.update_traces(marker_line_width=0, jitter=0.2)
-            box.update_layout(xaxis_tickangle=-45)
-            box = polish_figure(box, height=620, margin={"t": 70, "b": 170})
-            return dcc.Graph(figure=box, config={"displayModeBar": False})
-        else:
-            strip = px.strip(df, x="Sector", y="Total_OSS_Score", color="Severity", color_discrete_map=severity_colors,
-                             hover_data=["Company"], title="OSS Scores for Selected Sector")
-            strip.update_traces(marker_line_width=0, marker=dict(size=10, opacity=0.85))
-            strip = polish_figure(strip, height=560, margin={"t": 70, "b": 120})
-            return dcc.Graph(figure=strip, config={"displayModeBar": False})
-
-    # TAB 4: 
-    if tab == "tab-trends":
-        if "Year" not in df.columns:
-            return html.Div("No trend data available.", style={"color": "#777", "padding": "20px"})
-        companies_with_trends = df.groupby("Company")["Year"].nunique()
-        companies_with_trends = companies_with_trends[companies_with_trends > 1].index.tolist()
-        if not companies_with_trends:
-            return html.Div("No companies with multi-year data available.", style={"color": "#777", "padding": "20px"})
-        
-        trend_df = df[df["Company"].isin(companies_with_trends)].sort_values(["Company", "Year"])
-        
-        trend_stats = []
-        for company in companies_with_trends:
-            comp_data = trend_df[trend_df["Company"] == company].sort_values("Year")
-            if len(comp_data) >= 2:
-                first_year = comp_data.iloc[0]
-                last_year = comp_data.iloc[-1]
-                
-                if first_year["Total_OSS_Score"] == 0 or last_year["Total_OSS_Score"] == 0:
-                    continue
-                
-                oss_change = last_year["Total_OSS_Score"] - first_year["Total_OSS_Score"]
-                years_span = last_year["Year"] - first_year["Year"]
-                avg_annual_change = oss_change / years_span if years_span > 0 else 0
-                direction = "↓ Improving" if oss_change < 0 else ("↑ Worsening" if oss_change > 0 else "→ Stable")
-                
-                trend_stats.append({
-                    "Company": company,
-                    "Start Year": int(first_year["Year"]),
-                    "End Year": int(last_year["Year"]),
-                    "Start OSS": first_year["Total_OSS_Score"],
-                    "End OSS": last_year["Total_OSS_Score"],
-                    "Change": oss_change,
-                    "Avg Annual Change": avg_annual_change,
-                    "Direction": direction,
-                    "Start Severity": first_year["Severity"],
-                    "End Severity": last_year["Severity"]
-                })
-        
-        trend_stats_df = pd.DataFrame(trend_stats)
-        
-        improving = len(trend_stats_df[trend_stats_df["Change"] < 0])
-        worsening = len(trend_stats_df[trend_stats_df["Change"] > 0])
-        stable = len(trend_stats_df[trend_stats_df["Change"] == 0])
-        avg_change = trend_stats_df["Change"].mean()
-        
-        summary_cards = dbc.Row([
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Companies Improving", className="metric-title"),
-                        html.Div(improving, className="metric-value", style={"color": "#27ae60"}),
-                        html.Div(f"(OSS decreasing)", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
-            ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Companies Worsening", className="metric-title"),
-                        html.Div(worsening, className="metric-value", style={"color": "#e74c3c"}),
-                        html.Div(f"(OSS increasing)", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
-            ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Avg Annual Change", className="metric-title"),
-                        html.Div(f"{avg_change:+.2f}", className="metric-value", style={"color": "#0f766e"}),
-                        html.Div("Points per year", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
-            ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Companies Tracked", className="metric-title"),
-                        html.Div(len(trend_stats_df), className="metric-value", style={"color": "#2980b9"}),
-                        html.Div("With multi-year data", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
-            ),
-        ], className="mb-4")
-        
-        fig = px.line(
-            trend_df, 
-            x="Year", 
-            y="Total_OSS_Score", 
-            color="Company", 
-            hover_data={
-                "Sector": True,
-                "Type": True,
-                "Severity": True,
-                "Total_Missing_KPIs": True,
-                "Present_Percentage": ":.1f"
-            },
-            title="OSS Score Trends Over Time (Lower = Better Transparency)",
-            markers=True,
-            custom_data=["Sector", "Type", "Severity"]
-        )
 
-        fig.update_traces(
-            mode='lines+markers',
-            marker=dict(
-                size=12,
-                opacity=0.9,
-                line=dict(width=2, color='white')
+# ---------------------
+# Tab views
+# ---------------------
+# Each filter-dependent tab is a ``build(data, df)`` function registered with
+# ``tab_view``; it gets its own callback and figure cache (see Callbacks) and
+# only runs while its tab is visible. ``df`` is the filtered, non-empty company
+# view. ``inputs`` names the sidebar controls (keys of ``VIEW_INPUTS``) the view
+# depends on: only those trigger its callback and make up its cache key. Views
+# without "sortby" get ``df`` unsorted, so changing Sort By never re-renders them.
+VIEW_INPUTS = {"filters": ("filter-state", "data"), "sortby": ("sortby-filter", "value")}
+TAB_VIEWS = {}
+TAB_INPUTS = {}
+
+def tab_view(tab, inputs=("filters",)):
+    def register(build):
+        TAB_VIEWS[tab] = build
+        TAB_INPUTS[tab] = tuple(inputs)
+        figure_caches[tab] = tab_figure_cache(tab)
+        return build
+    return register
+
+# Sort By is applied in the browser (see oss_tab), so it is not an input here.
+@tab_view("tab-oss")
+def oss_tab(data, df):
+    fig = px.bar(df, x="Company", y="Total_OSS_Score", color="Severity", color_discrete_map=severity_colors,
+                 hover_data=["Sector", "Type", "Year"], title="OSS Score Distribution (Lower = More Transparent)", text="Total_OSS_Score")
+    fig.update_layout(xaxis_tickangle=-45)
+    fig = polish_figure(fig, height=620, margin={"t": 70, "b": 160})
+    # The bars are drawn in the browser (ossFigure in assets/clientside.js) from these
+    # records, so Sort By and the severity toggles never reach the server.
+    records = df[["Company", "Total_OSS_Score", "Severity", "Sector", "Type", "Year"]]
+    payload = {
+        "records": json_scores(records).astype({"Company": str, "Severity": str, "Sector": str, "Type": str}).to_dict("list"),
+        "layout": fig.to_plotly_json()["layout"],
+        "colors": severity_colors,
+    }
+    present = set(payload["records"]["Severity"])
+    toggles = dcc.Checklist(
+        id="oss-severity-toggle",
+        options=[{"label": f" {level}", "value": level} for level in SEVERITY_LEVELS if level in present],
+        value=[level for level in SEVERITY_LEVELS if level in present],
+        inline=True,
+        inputStyle={"marginRight": "4px"},
+        labelStyle={"marginRight": "16px"},
+    )
+    return html.Div([
+        dcc.Store(id="oss-records", data=payload),
+        toggles,
+        dcc.Graph(id="oss-graph", figure={"layout": payload["layout"]}, config={"displayModeBar": False}),
+    ])
+
+@tab_view("tab-severity")
+def severity_tab(data, df):
+    # Count labels rather than categories so unused bands are not drawn and ties keep first-seen order.
+    counts = df["Severity"].astype(str).value_counts().reset_index()
+    counts.columns = ["Severity", "Count"]
+    pie = px.pie(counts, names="Severity", values="Count", hole=0.4, color="Severity", color_discrete_map=severity_colors,
+                 title="Distribution of Severity Levels")
+    pie.update_traces(textinfo="percent+label", pull=[0.03]*len(counts))
+    pie = polish_figure(pie, height=560, margin={"t": 60, "b": 40})
+    return dcc.Graph(figure=pie, config={"displayModeBar": False})
+
+@tab_view("tab-sector", inputs=("filters", "sortby"))
+def sector_tab(data, df):
+    sector_order = df.groupby("Sector", observed=True)["Total_OSS_Score"].median().sort_values().index.tolist()
+    if df["Sector"].nunique() > 1:
+        box = px.box(df, x="Sector", y="Total_OSS_Score", points="all", color="Severity",
+                     color_discrete_map=severity_colors, category_orders={"Sector": sector_order},
+                     title="OSS Score Variation by Sector")
+        box.update_traces(marker_line_width=0, jitter=0.2)
+        box.update_layout(xaxis_tickangle=-45)
+        box = polish_figure(box, height=620, margin={"t": 70, "b": 170})
+        return dcc.Graph(figure=box, config={"displayModeBar": False})
+    else:
+        strip = px.strip(df, x="Sector", y="Total_OSS_Score", color="Severity", color_discrete_map=severity_colors,
+                         hover_data=["Company"], title="OSS Scores for Selected Sector")
+        strip.update_traces(marker_line_width=0, marker=dict(size=10, opacity=0.85))
+        strip = polish_figure(strip, height=560, margin={"t": 70, "b": 120})
+        return dcc.Graph(figure=strip, config={"displayModeBar": False})
+
+@tab_view("tab-trends")
+def trends_tab(data, df):
+    if "Year" not in df.columns:
+        return html.Div("No trend data available.", style={"color": "#777", "padding": "20px"})
+    trend_df = multi_year(df)
+    if trend_df.empty:
+        return html.Div("No companies with multi-year data available.", style={"color": "#777", "padding": "20px"})
+
+    trend_stats_df = company_trends(trend_df)
+    if trend_stats_df.empty:
+        return html.Div("No companies with valid trend data.", style={"color": "#777", "padding": "20px"})
+
+    improving = len(trend_stats_df[trend_stats_df["Change"] < 0])
+    worsening = len(trend_stats_df[trend_stats_df["Change"] > 0])
+    stable = len(trend_stats_df[trend_stats_df["Change"] == 0])
+    avg_change = trend_stats_df["Change"].mean()
+    
+    summary_cards = dbc.Row([
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Companies Improving", className="metric-title"),
+                    html.Div(improving, className="metric-value", style={"color": "#27ae60"}),
+                    html.Div(f"(OSS decreasing)", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            line=dict(width=3),
-            hovertemplate='<b>%{fullData.name}</b><br>' +
-                          'Year: %{x}<br>' +
-                          'OSS Score: %{y:.1f}<br>' +
-                          'Sector: %{customdata[0]}<br>' +
-                          'Type: %{customdata[1]}<br>' +
-                          'Severity: %{customdata[2]}<extra></extra>'
-        )
-        
-        fig.update_layout(
-            hovermode="x unified",
-            xaxis=dict(
-                type="category",
-                title="Year",
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(0,0,0,0.05)'
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Companies Worsening", className="metric-title"),
+                    html.Div(worsening, className="metric-value", style={"color": "#e74c3c"}),
+                    html.Div(f"(OSS increasing)", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            yaxis=dict(
-                title="OSS Score (Lower = More Transparent)",
-                showgrid=True,
-                gridwidth=1,
-                gridcolor='rgba(0,0,0,0.05)',
-                zeroline=False
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Avg Annual Change", className="metric-title"),
+                    html.Div(f"{avg_change:+.2f}", className="metric-value", style={"color": "#0f766e"}),
+                    html.Div("Points per year", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(family="Inter", color="#0b1220", size=11),
-            legend=dict(
-                orientation="v",
-                yanchor="top",
-                y=0.99,
-                xanchor="left",
-                x=0.01,
-                bgcolor="rgba(255,255,255,0.85)",
-                bordercolor="rgba(0,0,0,0.1)",
-                borderwidth=1
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Companies Tracked", className="metric-title"),
+                    html.Div(len(trend_stats_df), className="metric-value", style={"color": "#2980b9"}),
+                    html.Div("With multi-year data", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            margin={"t": 70, "b": 100, "l": 70, "r": 40},
-            height=680
-        )
-        
-        table_df = trend_stats_df[["Company", "Start Year", "End Year", "Start OSS", "End OSS", "Change", "Avg Annual Change", "Direction"]].copy()
-        
-        table_df["Start OSS"] = table_df["Start OSS"].round(2)
-        table_df["End OSS"] = table_df["End OSS"].round(2)
-        table_df["Change"] = table_df["Change"].round(2)
-        table_df["Avg Annual Change"] = table_df["Avg Annual Change"].round(2)
-        
-        table_df = table_df.sort_values("Change")
-
-        if trend_stats_df.empty:
-            return html.Div("No companies with valid trend data.", style={"color": "#777", "padding": "20px"})
+            md=3
+        ),
+    ], className="mb-4")
+    
+    fig = px.line(
+        trend_df, 
+        x="Year", 
+        y="Total_OSS_Score", 
+        color="Company", 
+        hover_data={
+            "Sector": True,
+            "Type": True,
+            "Severity": True,
+            "Total_Missing_KPIs": True,
+            "Present_Percentage": ":.1f"
+        },
+        title="OSS Score Trends Over Time (Lower = Better Transparency)",
+        markers=True,
+        custom_data=["Sector", "Type", "Severity"]
+    )
 
-        trend_table = dash_table.DataTable(
-            columns=[{"name": c, "id": c} for c in table_df.columns],
-            data=table_df.to_dict("records"),
-            style_table={"overflowX": "auto", "marginTop": "20px"},
-            style_cell={
-                "padding": "12px",
-                "textAlign": "center",
-                "border": "none",
-                "fontSize": "0.9rem",
-                "fontWeight": "500"
+    fig.update_traces(
+        mode='lines+markers',
+        marker=dict(
+            size=12,
+            opacity=0.9,
+            line=dict(width=2, color='white')
+        ),
+        line=dict(width=3),
+        hovertemplate='<b>%{fullData.name}</b><br>' +
+                      'Year: %{x}<br>' +
+                      'OSS Score: %{y:.1f}<br>' +
+                      'Sector: %{customdata[0]}<br>' +
+                      'Type: %{customdata[1]}<br>' +
+                      'Severity: %{customdata[2]}<extra></extra>'
+    )
+    
+    fig.update_layout(
+        hovermode="x unified",
+        xaxis=dict(
+            type="category",
+            title="Year",
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(0,0,0,0.05)'
+        ),
+        yaxis=dict(
+            title="OSS Score (Lower = More Transparent)",
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(0,0,0,0.05)',
+            zeroline=False
+        ),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(family="Inter", color="#0b1220", size=11),
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=0.99,
+            xanchor="left",
+            x=0.01,
+            bgcolor="rgba(255,255,255,0.85)",
+            bordercolor="rgba(0,0,0,0.1)",
+            borderwidth=1
+        ),
+        margin={"t": 70, "b": 100, "l": 70, "r": 40},
+        height=680
+    )
+    
+    table_df = trend_stats_df[["Company", "Start Year", "End Year", "Start OSS", "End OSS", "Change", "Avg Annual Change", "Direction"]].copy()
+    
+    table_df["Start OSS"] = table_df["Start OSS"].round(2)
+    table_df["End OSS"] = table_df["End OSS"].round(2)
+    table_df["Change"] = table_df["Change"].round(2)
+    table_df["Avg Annual Change"] = table_df["Avg Annual Change"].round(2)
+    
+    table_df = table_df.sort_values("Change")
+
+    trend_table = dash_table.DataTable(
+        columns=[{"name": c, "id": c} for c in table_df.columns],
+        data=table_df.to_dict("records"),
+        style_table={"overflowX": "auto", "marginTop": "20px"},
+        style_cell={
+            "padding": "12px",
+            "textAlign": "center",
+            "border": "none",
+            "fontSize": "0.9rem",
+            "fontWeight": "500"
+        },
+        style_header={
+            "fontWeight": "700",
+            "backgroundColor": "#eef1f8",
+            "border": "none",
+            "color": "#0f766e",
+            "textAlign": "center"
+        },
+        style_data_conditional=[
+            {
+                "if": {"row_index": "odd"},
+                "backgroundColor": "rgba(15,118,110,0.02)"
             },
-            style_header={
-                "fontWeight": "700",
-                "backgroundColor": "#eef1f8",
-                "border": "none",
-                "color": "#0f766e",
-                "textAlign": "center"
+            {
+                "if": {"column_id": "Change", "filter_query": "{Change} < 0"},
+                "backgroundColor": "rgba(39, 174, 96, 0.08)",
+                "color": "#27ae60",
+                "fontWeight": "600"
             },
-            style_data_conditional=[
-                {
-                    "if": {"row_index": "odd"},
-                    "backgroundColor": "rgba(15,118,110,0.02)"
-                },
-                {
-                    "if": {"column_id": "Change", "filter_query": "{Change} < 0"},
-                    "backgroundColor": "rgba(39, 174, 96, 0.08)",
-                    "color": "#27ae60",
-                    "fontWeight": "600"
-                },
-                {
-                    "if": {"column_id": "Change", "filter_query": "{Change} > 0"},
-                    "backgroundColor": "rgba(231, 76, 60, 0.08)",
-                    "color": "#e74c3c",
-                    "fontWeight": "600"
-                }
-            ]
-        )
-        
-        interval_pairs = [(2021, 2022), (2022, 2023), (2021, 2023)]
-        interval_summaries = []
-        for start_year, end_year in interval_pairs:
-            label = f"{start_year} - {end_year}"
-            records = []
-            for company in trend_df["Company"].unique():
-                comp_slice = trend_df[trend_df["Company"] == company]
-                start_row = comp_slice[comp_slice["Year"] == start_year]
-                end_row = comp_slice[comp_slice["Year"] == end_year]
-                if start_row.empty or end_row.empty:
-                    continue
-                start_score = start_row.iloc[-1]["Total_OSS_Score"]
-                end_score = end_row.iloc[-1]["Total_OSS_Score"]
-                if start_score == 0 or end_score == 0:
-                    continue
-                delta = end_score - start_score
-                records.append({
-                    "Company": company,
-                    "Change": delta,
-                    "StartSeverity": start_row.iloc[-1]["Severity"],
-                    "EndSeverity": end_row.iloc[-1]["Severity"]
-                })
-            if not records:
-                interval_summaries.append({"label": label, "improve": None, "worsen": None})
-                continue
-            records = sorted(records, key=lambda x: x["Change"])
-            best = records[0]
-            worst = records[-1]
-            interval_summaries.append({
-                "label": label,
-                "improve": best if best["Change"] < 0 else None,
-                "worsen": worst if worst["Change"] > 0 else None
-            })
-
-        interval_items = []
-        for summary in interval_summaries:
-            improve = summary["improve"]
-            worsen = summary["worsen"]
-            improve_text = f"{improve['Company']} ({improve['Change']:+.1f}, {improve['StartSeverity']} -> {improve['EndSeverity']})" if improve else "N/A"
-            worsen_text = f"{worsen['Company']} ({worsen['Change']:+.1f}, {worsen['StartSeverity']} -> {worsen['EndSeverity']})" if worsen else "N/A"
-            interval_items.append(html.Li([
-                html.Strong(f"{summary['label']}: "),
-                f"Improving: {improve_text} | Worsening: {worsen_text}"
-            ], style={"marginBottom": "6px"}))
-
-        most_improved = trend_stats_df.loc[trend_stats_df["Change"].idxmin()]
-        most_declined = trend_stats_df.loc[trend_stats_df["Change"].idxmax()]
-
-        insights = dbc.Card(
-            dbc.CardBody([
-                html.H6("Key Insights", style={"fontWeight": "700", "marginBottom": "12px", "color": "#0f766e"}),
-                dbc.Row([
-                    dbc.Col([html.P("🟢 Most Improved", style={"fontWeight": "600", "marginBottom": "4px", "color": "#27ae60"}),
-                              html.P(f"{most_improved['Company']}: {most_improved['Change']:+.1f} points", style={"marginBottom": "2px"}),
-                              html.P(f"From {most_improved['Start Severity']} → {most_improved['End Severity']}", style={"fontSize": "0.85rem", "color": "#5b6475"})], md=6),
-                    dbc.Col([html.P("🔴 Most Declined", style={"fontWeight": "600", "marginBottom": "4px", "color": "#e74c3c"}),
-                              html.P(f"{most_declined['Company']}: {most_declined['Change']:+.1f} points", style={"marginBottom": "2px"}),
-                              html.P(f"From {most_declined['Start Severity']} → {most_declined['End Severity']}", style={"fontSize": "0.85rem", "color": "#5b6475"})], md=6),
-                ]),
-                html.Hr(style={"margin": "12px 0", "borderColor": "#e5e7eb"}),
-                html.P("Interval snapshots", style={"fontWeight": "700", "marginBottom": "6px"}),
-                html.Ul(interval_items, style={"paddingLeft": "18px", "color": "#3a3f4b", "fontSize": "0.9rem"}),
-                html.Hr(style={"margin": "12px 0", "borderColor": "#e5e7eb"}),
-                html.P(
-                    "Negative change = improving transparency. Positive change = decreasing transparency. "
-                    "The average annual change shows the typical rate of improvement or decline per year.",
-                    style={"fontSize": "0.85rem", "color": "#5b6475", "fontStyle": "italic", "marginBottom": 0}
-                )
+            {
+                "if": {"column_id": "Change", "filter_query": "{Change} > 0"},
+                "backgroundColor": "rgba(231, 76, 60, 0.08)",
+                "color": "#e74c3c",
+                "fontWeight": "600"
+            }
+        ]
+    )
+    
+    interval_summaries = interval_movers(trend_df)
+
+    interval_items = []
+    for summary in interval_summaries:
+        improve = summary["improve"]
+        worsen = summary["worsen"]
+        improve_text = f"{improve['Company']} ({improve['Change']:+.1f}, {improve['StartSeverity']} -> {improve['EndSeverity']})" if improve else "N/A"
+        worsen_text = f"{worsen['Company']} ({worsen['Change']:+.1f}, {worsen['StartSeverity']} -> {worsen['EndSeverity']})" if worsen else "N/A"
+        interval_items.append(html.Li([
+            html.Strong(f"{summary['label']}: "),
+            f"Improving: {improve_text} | Worsening: {worsen_text}"
+        ], style={"marginBottom": "6px"}))
+
+    most_improved = trend_stats_df.loc[trend_stats_df["Change"].idxmin()]
+    most_declined = trend_stats_df.loc[trend_stats_df["Change"].idxmax()]
+
+    insights = dbc.Card(
+        dbc.CardBody([
+            html.H6("Key Insights", style={"fontWeight": "700", "marginBottom": "12px", "color": "#0f766e"}),
+            dbc.Row([
+                dbc.Col([html.P("🟢 Most Improved", style={"fontWeight": "600", "marginBottom": "4px", "color": "#27ae60"}),
+                          html.P(f"{most_improved['Company']}: {most_improved['Change']:+.1f} points", style={"marginBottom": "2px"}),
+                          html.P(f"From {most_improved['Start Severity']} → {most_improved['End Severity']}", style={"fontSize": "0.85rem", "color": "#5b6475"})], md=6),
+                dbc.Col([html.P("🔴 Most Declined", style={"fontWeight": "600", "marginBottom": "4px", "color": "#e74c3c"}),
+                          html.P(f"{most_declined['Company']}: {most_declined['Change']:+.1f} points", style={"marginBottom": "2px"}),
+                          html.P(f"From {most_declined['Start Severity']} → {most_declined['End Severity']}", style={"fontSize": "0.85rem", "color": "#5b6475"})], md=6),
             ]),
-            className="elegant-card"
-        )
-        
-        return html.Div([
-            summary_cards,
-            html.Hr(style={"margin": "20px 0", "borderColor": "#e5e7eb"}),
-            dcc.Graph(figure=fig, config={"displayModeBar": True}),
-            html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
-            html.H5("Trend Summary by Company", style={"fontWeight": "700", "marginBottom": "12px"}),
-            trend_table,
-            html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
-            insights
-        ])
-
-    # TAB 5: 
-    if tab == "tab-kpi-breakdown":
-        if kpi_df.empty or df.empty:
-            return html.Div("No KPI data available.", style={"color": "#777", "padding": "20px"})
-        labels = ["All KPIs"]; parents = [""]; values = [1]; colors = [0]
-        categories = kpi_df["Category"].unique()
-        category_missing_counts = {}; category_total_possible = {}; all_missing_total = 0; all_total = 0
-        for cat in categories:
-            category_missing_counts[cat] = 0; category_total_possible[cat] = 0
-            labels.append(cat); parents.append("All KPIs"); values.append(1); colors.append(0)
-        for _, kpi_row in kpi_df.iterrows():
-            kpi_name = kpi_row["KPI"]; category = kpi_row["Category"]
-            companies_missing = 0
-            for _, company_row in df.iterrows():
-                company_name = company_row["Company"]; value_col = f"{company_name}_value"
-                if value_col in kpi_row.index:
-                    if kpi_row[value_col] == 1:
-                        companies_missing += 1
-            missing_rate = (companies_missing / len(df) * 100) if len(df) > 0 else 0
-            labels.append(f"{kpi_name}<br>({missing_rate:.2f}%)"); parents.append(category); values.append(len(df)); colors.append(missing_rate)
-            category_missing_counts[category] += companies_missing
-            category_total_possible[category] += len(df)
-            all_missing_total += companies_missing; all_total += len(df)
-        for i, label in enumerate(labels[1:], start=1):
-            if label in category_missing_counts:
-                category_val = category_missing_counts[label]; category_tot = category_total_possible[label]
-                category_pct = (category_val / category_tot * 100) if category_tot > 0 else 0
-                colors[i] = category_pct
-        root_pct = (all_missing_total / all_total * 100) if all_total > 0 else 0
-        colors[0] = root_pct
-        sunburst = go.Figure(go.Sunburst(labels=labels, parents=parents, values=values, marker=dict(colors=colors, colorscale="RdYlGn_r", cmid=50, colorbar=dict(title="Missing %"), line=dict(width=0.5, color="white")), insidetextorientation='radial', hovertemplate="<b>%{label}</b><br>Missing Rate: %{color:.2f}%<extra></extra>"))
-        sunburst.update_layout(title="KPI Category Breakdown — Missing Rates Across Selected Companies", height=700)
-        sunburst = polish_figure(sunburst, height=700, margin={"t": 80, "b": 40})
-        return dcc.Graph(figure=sunburst, config={"displayModeBar": True})
-
-    # TAB 6: 
-    if tab == "tab-radar":
-        if kpi_df.empty:
-            return html.Div("No KPI data available.", style={"color": "#777"})
-        
-        kpi_data = []
-        for _, kpi_row in kpi_df.iterrows():
-            kpi_name = kpi_row["KPI"]
-            category = kpi_row["Category"]
-            weight = kpi_row["Weight"]
-            companies_missing = 0
-            total_points = 0
-            for _, company_row in df.iterrows():
-                company_name = company_row["Company"]
-                value_col = f"{company_name}_value"
-                oss_col = f"{company_name}_oss"
-                if value_col in kpi_row.index and oss_col in kpi_row.index:
-                    if kpi_row[value_col] == 1:
-                        companies_missing += 1
-                        total_points += kpi_row[oss_col]
-            if companies_missing > 0:
-                missing_pct = (companies_missing / len(df) * 100) if len(df) > 0 else 0
-                kpi_data.append({
-                    'kpi': kpi_name,
-                    'category': category,
-                    'missing_count': companies_missing,
-                    'missing_pct': missing_pct,
-                    'total_points': total_points,
-                    'weight': weight
-                })
-        
-        if not kpi_data:
-            return html.Div("No missing KPIs found in the selected companies.", style={"color": "#777", "padding": "20px"})
-        
-        kpi_data_sorted = sorted(kpi_data, key=lambda x: x['missing_count'], reverse=True)[:20]
-        
-        total_unique_missing_kpis = len(kpi_data)
-        avg_missing_pct = np.mean([item['missing_pct'] for item in kpi_data])
-        max_missing_count = kpi_data_sorted[0]['missing_count'] if kpi_data_sorted else 0
-        total_oss_impact = sum([item['total_points'] for item in kpi_data_sorted])
-        
-        summary_cards = dbc.Row([
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Total Missing KPIs", className="metric-title"),
-                        html.Div(total_unique_missing_kpis, className="metric-value"),
-                        html.Div(f"Across {len(df)} entries", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
+            html.Hr(style={"margin": "12px 0", "borderColor": "#e5e7eb"}),
+            html.P("Interval snapshots", style={"fontWeight": "700", "marginBottom": "6px"}),
+            html.Ul(interval_items, style={"paddingLeft": "18px", "color": "#3a3f4b", "fontSize": "0.9rem"}),
+            html.Hr(style={"margin": "12px 0", "borderColor": "#e5e7eb"}),
+            html.P(
+                "Negative change = improving transparency. Positive change = decreasing transparency. "
+                "The average annual change shows the typical rate of improvement or decline per year.",
+                style={"fontSize": "0.85rem", "color": "#5b6475", "fontStyle": "italic", "marginBottom": 0}
+            )
+        ]),
+        className="elegant-card"
+    )
+    
+    return html.Div([
+        summary_cards,
+        html.Hr(style={"margin": "20px 0", "borderColor": "#e5e7eb"}),
+        dcc.Graph(figure=fig, config={"displayModeBar": True}),
+        html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
+        html.H5("Trend Summary by Company", style={"fontWeight": "700", "marginBottom": "12px"}),
+        trend_table,
+        html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
+        insights
+    ])
+
+@tab_view("tab-kpi-breakdown")
+def kpi_breakdown_tab(data, df):
+    kpi_df, kpi_matrix = data.kpis, data.matrix
+    if kpi_df.empty or df.empty:
+        return html.Div("No KPI data available.", style={"color": "#777", "padding": "20px"})
+    n = len(df)
+    rates = kpi_matrix.breakdown(df["entity_id"].to_numpy())
+    categories = list(kpi_matrix.categories)
+    kpi_labels = [f"{name}<br>({rate:.2f}%)" for name, rate in zip(kpi_df["KPI"], rates["kpi_rate"])]
+    # Root, then one node per category, then one leaf per KPI under its category.
+    labels = ["All KPIs"] + categories + kpi_labels
+    parents = [""] + ["All KPIs"] * len(categories) + kpi_df["Category"].tolist()
+    values = [1] * (1 + len(categories)) + [n] * len(kpi_labels)
+    colors = np.concatenate([[rates["overall_rate"]], rates["category_rate"], rates["kpi_rate"]])
+    sunburst = go.Figure(go.Sunburst(labels=labels, parents=parents, values=values, marker=dict(colors=colors, colorscale="RdYlGn_r", cmid=50, colorbar=dict(title="Missing %"), line=dict(width=0.5, color="white")), insidetextorientation='radial', hovertemplate="<b>%{label}</b><br>Missing Rate: %{color:.2f}%<extra></extra>"))
+    sunburst.update_layout(title="KPI Category Breakdown — Missing Rates Across Selected Companies", height=700)
+    sunburst = polish_figure(sunburst, height=700, margin={"t": 80, "b": 40})
+    return dcc.Graph(figure=sunburst, config={"displayModeBar": True})
+
+@tab_view("tab-radar")
+def radar_tab(data, df):
+    kpi_df, kpi_matrix = data.kpis, data.matrix
+    if kpi_df.empty:
+        return html.Div("No KPI data available.", style={"color": "#777"})
+    
+    top = kpi_matrix.top_missing(df["entity_id"].to_numpy(), n=20)
+    if not top["unique_missing"]:
+        return html.Div("No missing KPIs found in the selected companies.", style={"color": "#777", "padding": "20px"})
+    
+    total_unique_missing_kpis = top["unique_missing"]
+    avg_missing_pct = top["avg_missing_rate"]
+    max_missing_count = top["max_missing"]
+    total_oss_impact = top["oss_impact"]
+    
+    summary_cards = dbc.Row([
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Total Missing KPIs", className="metric-title"),
+                    html.Div(total_unique_missing_kpis, className="metric-value"),
+                    html.Div(f"Across {len(df)} entries", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Avg Missing Rate", className="metric-title"),
-                        html.Div(f"{avg_missing_pct:.1f}%", className="metric-value"),
-                        html.Div("Average across all KPIs", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Avg Missing Rate", className="metric-title"),
+                    html.Div(f"{avg_missing_pct:.1f}%", className="metric-value"),
+                    html.Div("Average across all KPIs", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("Most Missing", className="metric-title"),
-                        html.Div(f"{max_missing_count}", className="metric-value"),
-                        html.Div("Max missing count (top KPI)", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("Most Missing", className="metric-title"),
+                    html.Div(f"{max_missing_count}", className="metric-value"),
+                    html.Div("Max missing count (top KPI)", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-            dbc.Col(
-                dbc.Card(
-                    dbc.CardBody([
-                        html.Div("OSS Impact (Top 20)", className="metric-title"),
-                        html.Div(f"{total_oss_impact:.0f}", className="metric-value"),
-                        html.Div("Total severity points", className="metric-subtext")
-                    ]),
-                    className="elegant-card"
-                ),
-                md=3
+            md=3
+        ),
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody([
+                    html.Div("OSS Impact (Top 20)", className="metric-title"),
+                    html.Div(f"{total_oss_impact:.0f}", className="metric-value"),
+                    html.Div("Total severity points", className="metric-subtext")
+                ]),
+                className="elegant-card"
             ),
-        ], className="mb-4")
-        
-        kpi_labels = [f"{item['kpi'][:30]}" for item in kpi_data_sorted]  
-        kpi_labels_full = [item['kpi'] for item in kpi_data_sorted]
-        missing_counts = [item['missing_count'] for item in kpi_data_sorted]
-        missing_pcts = [item['missing_pct'] for item in kpi_data_sorted]
-        total_oss_points = [item['total_points'] for item in kpi_data_sorted]
-        categories = [item['category'] for item in kpi_data_sorted]
-        
-        category_color_map = {
-            cat: f"hsl({i*30}, 70%, 50%)" 
-            for i, cat in enumerate(sorted(set(categories)))
-        }
-        bar_colors = [category_color_map[cat] for cat in categories]
-        
-        bar_df_vis = pd.DataFrame({
-            'KPI': kpi_labels,
-            'Missing Count': missing_counts,
-            'Missing %': missing_pcts,
-            'OSS Points': total_oss_points,
-            'Category': categories,
-            'Full Name': kpi_labels_full
+            md=3
+        ),
+    ], className="mb-4")
+    
+    top_kpis = kpi_df.iloc[top["positions"]]
+    kpi_labels_full = top_kpis["KPI"].tolist()
+    kpi_labels = [name[:30] for name in kpi_labels_full]
+    missing_counts = top["missing_count"].tolist()
+    missing_pcts = top["missing_rate"].tolist()
+    total_oss_points = top["oss_points"].tolist()
+    categories = top_kpis["Category"].tolist()
+    
+    category_color_map = {
+        cat: f"hsl({i*30}, 70%, 50%)" 
+        for i, cat in enumerate(sorted(set(categories)))
+    }
+    bar_colors = [category_color_map[cat] for cat in categories]
+    
+    bar_df_vis = pd.DataFrame({
+        'KPI': kpi_labels,
+        'Missing Count': missing_counts,
+        'Missing %': missing_pcts,
+        'OSS Points': total_oss_points,
+        'Category': categories,
+        'Full Name': kpi_labels_full
+    })
+    
+    bar_fig = px.bar(
+        bar_df_vis,
+        x='Missing Count',
+        y='KPI',
+        orientation='h',
+        color='Category',
+        hover_data={
+            'Missing %': ':.1f',
+            'OSS Points': ':.0f',
+            'Full Name': True,
+            'Category': True,
+            'KPI': False
+        },
+        title="Top 20 Most Missing KPIs by Frequency",
+        labels={'Missing Count': 'Number of Entries Missing', 'KPI': 'KPI Name'},
+        text='Missing Count'
+    )
+    
+    bar_fig.update_traces(
+        textposition='outside',
+        hovertemplate='<b>%{customdata[3]}</b>' +
+                      '<br>Missing in: %{x} entries' +
+                      '<br>Missing Rate: %{customdata[0]:.1f}%' +
+                      '<br>OSS Impact: %{customdata[1]:.0f}' +
+                      '<br>Category: %{customdata[2]}<extra></extra>',
+        marker=dict(line=dict(width=0.5, color='white'))
+    )
+    
+    bar_fig.update_layout(
+        height=650,
+        xaxis_title='Number of Company-Year Entries Missing',
+        yaxis_title='',
+        showlegend=True,
+        legend=dict(
+            orientation="v",
+            yanchor="top",
+            y=0.99,
+            xanchor="right",
+            x=0.99,
+            bgcolor="rgba(255,255,255,0.8)",
+            bordercolor="rgba(0,0,0,0.1)",
+            borderwidth=1
+        ),
+        hovermode='closest',
+        margin={"t": 60, "b": 80, "l": 200, "r": 40}
+    )
+    
+    bar_fig = polish_figure(bar_fig, height=650, margin={"t": 60, "b": 80, "l": 200, "r": 200})
+    
+    radar_fig = go.Figure()
+    radar_fig.add_trace(go.Scatterpolar(
+        r=missing_counts,
+        theta=kpi_labels,
+        fill='toself',
+        name='Missing Count',
+        line=dict(color='#0f766e', width=2.5),
+        fillcolor='rgba(15, 118, 110, 0.25)',
+        hovertemplate='<b>%{theta}</b>' +
+                      '<br>Missing: %{r} entries' +
+                      '<br>Rate: %{customdata[0]:.1f}%' +
+                      '<br>OSS Points: %{customdata[1]:.0f}<extra></extra>',
+        customdata=np.column_stack((missing_pcts, total_oss_points)),
+        marker=dict(size=8, color='#e74c3c')
+    ))
+    
+    radar_fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, max(missing_counts) * 1.2] if missing_counts else [0, 10],
+                showticklabels=True,
+                ticks='outside',
+                gridcolor='rgba(0,0,0,0.1)',
+                tickfont=dict(size=10)
+            ),
+            angularaxis=dict(
+                rotation=90,
+                direction='clockwise',
+                gridcolor='rgba(0,0,0,0.08)',
+                tickfont=dict(size=10)
+            ),
+            bgcolor='rgba(240,245,245,0.3)'
+        ),
+        showlegend=False,
+        title=dict(
+            text="Radar View: Distribution of Missing KPIs",
+            font=dict(size=16, family="Inter", color="#0b1220")
+        ),
+        height=700,
+        font=dict(size=11, family="Inter", color="#0b1220"),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        margin={"t": 80, "b": 40, "l": 40, "r": 40}
+    )
+    
+    rate_df = pd.DataFrame({
+        'KPI': kpi_labels_full[:10], 
+        'Missing Count': missing_counts[:10],
+        'Missing Rate (%)': [f"{p:.1f}" for p in missing_pcts[:10]],
+        'Category': categories[:10],
+        'OSS Impact': [f"{p:.0f}" for p in total_oss_points[:10]]
+    })
+    
+    rate_table = dash_table.DataTable(
+        columns=[{"name": c, "id": c} for c in rate_df.columns],
+        data=rate_df.to_dict("records"),
+        style_table={"overflowX": "auto", "marginTop": "20px"},
+        style_cell={"padding": "10px", "textAlign": "left", "border": "none", "fontSize": "0.9rem"},
+        style_header={"fontWeight": "700", "backgroundColor": "#eef1f8", "border": "none", "color": "#0f766e"},
+        style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "rgba(15,118,110,0.03)"}]
+    )
+    
+    explanation = dbc.Card(
+        dbc.CardBody([
+            html.H6("How to Read This Tab", style={"fontWeight": "700", "marginBottom": "12px"}),
+            html.Ul([
+                html.Li([html.Strong("Missing Count:"), " Number of company-year entries missing this KPI"]),
+                html.Li([html.Strong("Missing Rate (%):"), " Percentage of selected entries missing this KPI"]),
+                html.Li([html.Strong("OSS Impact:"), " Total severity points from missing this KPI across entries"]),
+                html.Li([html.Strong("Top 20:"), " Sorted by frequency—these are the most commonly missing KPIs"])
+            ], style={"color": "#5b6475", "fontSize": "0.9rem"}),
+            html.P("Use these insights to identify KPIs that most companies struggle to report, indicating potential areas for targeted improvement or industry-wide guidance.", 
+                   style={"marginTop": "12px", "color": "#5b6475", "fontSize": "0.85rem", "fontStyle": "italic"})
+        ]),
+        className="elegant-card"
+    )
+    
+    return html.Div([
+        summary_cards,
+        html.Hr(style={"margin": "20px 0", "borderColor": "#e5e7eb"}),
+        dcc.Graph(figure=bar_fig, config={"displayModeBar": True}),
+        html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
+        rate_table,
+        html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
+        dcc.Graph(figure=radar_fig, config={"displayModeBar": True}),
+        html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
+        explanation
+    ])
+
+@tab_view("tab-data")
+def data_table_tab(data, df):
+    # Only the shell: page_data_table fills in the visible page from the server,
+    # and re-sorts it itself when Sort By changes.
+    columns = [{"name": c, "id": c, "type": "numeric" if c in TABLE_NUMERIC or c == "Year" else "text"} for c in TABLE_COLUMNS]
+    table = dash_table.DataTable(id="data-table", columns=columns, data=[], page_current=0, page_size=TABLE_PAGE_SIZE, page_action="custom", sort_action="custom", sort_mode="single", sort_by=[], filter_action="custom", filter_query="", style_table={"overflowX": "auto"}, style_cell={"padding": "12px", "textAlign": "left", "border": "none"}, style_header={"fontWeight": "800", "backgroundColor": "#eef1f8", "border": "none"}, style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "rgba(124,93,250,0.03)"}])
+    return table
+
+@tab_view("tab-cat-impact")
+def category_impact_tab(data, df):
+    kpi_df, kpi_matrix = data.kpis, data.matrix
+    if kpi_df.empty or df.empty:
+        return html.Div("No KPI data available.", style={"color": "#777", "padding": "20px"})
+
+    rollup = kpi_matrix.category_rollup(df["entity_id"].to_numpy()).sort_index()
+    rollup = rollup[rollup["possible_weight"] > 0]
+    if rollup.empty:
+        return html.Div("No weighted data to display.", style={"color": "#777", "padding": "20px"})
+
+    cat_df = pd.DataFrame({
+        "category": rollup.index.astype(str),
+        "missing_weight": rollup["missing_weight"].to_numpy(),
+        "possible_weight": rollup["possible_weight"].to_numpy(),
+        "rate_pct": rollup["weighted_missing_rate"].to_numpy(),
+    })
+    total_missing_weight = float(cat_df["missing_weight"].sum())
+    total_possible = float(cat_df["possible_weight"].sum())
+    cat_df["share_of_missing"] = (cat_df["missing_weight"] / total_missing_weight * 100) if total_missing_weight > 0 else 0.0
+
+    overall_rate = (total_missing_weight / total_possible * 100) if total_possible > 0 else 0
+
+    top_row = cat_df.loc[cat_df["rate_pct"].idxmax()]
+
+    cards = dbc.Row([
+        dbc.Col(metric("Top gap category", top_row["category"], f"{top_row['rate_pct']:.1f}% weighted missing"), md=3),
+        dbc.Col(metric("Overall weighted missing", f"{overall_rate:.1f}%", f"{total_missing_weight:.1f} of {total_possible:.1f} weight"), md=3),
+        dbc.Col(metric("Categories covered", f"{len(cat_df)}", "KPI checklist categories"), md=3),
+    ], className="mb-3")
+
+    labels = ["All Categories"]
+    parents = [""]
+    values = [max(total_missing_weight, 0.0001)]
+    colors = [overall_rate]
+    customdata = [[total_missing_weight, total_possible, overall_rate, 100.0]]
+    labels += cat_df["category"].tolist()
+    parents += ["All Categories"] * len(cat_df)
+    values += cat_df["missing_weight"].where(cat_df["missing_weight"] > 0, 0.0001).tolist()
+    colors += cat_df["rate_pct"].tolist()
+    customdata += cat_df[["missing_weight", "possible_weight", "rate_pct", "share_of_missing"]].to_numpy().tolist()
+
+    treemap = go.Figure(go.Treemap(
+        labels=labels,
+        parents=parents,
+        values=values,
+        marker=dict(colors=colors, colorscale="Reds", colorbar=dict(title="Weighted Missing %"), line=dict(width=0.5, color="white")),
+        customdata=customdata,
+        hovertemplate="<b>%{label}</b><br>Weighted missing: %{customdata[0]:.2f}"
+                      "<br>Possible weight: %{customdata[1]:.2f}"
+                      "<br>Weighted missing rate: %{customdata[2]:.2f}%"
+                      "<br>Share of total missing: %{customdata[3]:.1f}%<extra></extra>"
+    ))
+    treemap.update_layout(title="Weighted Category Impact — Contribution to OSS via KPI Weights", height=640)
+    treemap = polish_figure(treemap, height=640, margin={"t": 80, "b": 40})
+
+    bar_df = cat_df.sort_values("rate_pct", ascending=True)
+    bar = px.bar(
+        bar_df,
+        x="rate_pct",
+        y="category",
+        orientation="h",
+        text="rate_pct",
+        color="share_of_missing",
+        color_continuous_scale="Reds",
+        labels={"rate_pct": "Weighted missing %", "category": "Category", "share_of_missing": "Share of total missing %"},
+        hover_data={
+            "missing_weight": ":.2f",
+            "possible_weight": ":.2f",
+            "share_of_missing": ":.1f",
+            "rate_pct": ":.1f",
+            "category": False
+        },
+        title="Weighted missing rate by category"
+    )
+    bar.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
+    bar = polish_figure(bar, height=520, margin={"t": 70, "b": 80, "l": 90, "r": 40})
+
+    explainer = html.Div(
+        "Weights come from the KPI checklist. Bars rank categories by weighted omission rate; color shows share of total missing weight.",
+        style={"marginTop": "12px", "color": "#444"}
+    )
+
+    return html.Div([
+        cards,
+        dcc.Graph(figure=bar, config={"displayModeBar": False}),
+        html.Hr(style={"margin": "16px 0"}),
+        dcc.Graph(figure=treemap, config={"displayModeBar": True}),
+        explainer
+    ])
+
+@tab_view("tab-gap", inputs=("filters", "sortby"))
+def gap_tab(data, df):
+    kpi_df, kpi_matrix = data.kpis, data.matrix
+    if "Type" not in df.columns:
+        return html.Div("No data available for gap analysis.", style={"color": "#777", "padding": "20px"})
+    type_lower = df["Type"].astype(str).str.lower()
+    is_non = type_lower.str.contains("non-quotate", na=False)
+    # "Non-Quotate" contains "quotate" too, so listed companies exclude it explicitly.
+    q_df = df[type_lower.str.contains("quotate", na=False) & ~is_non]
+    n_df = df[is_non]
+    if q_df.empty or n_df.empty:
+        return html.Div("Need both Quotate and Non-Quotate groups to compare.", style={"color": "#777", "padding": "20px"})
+    oss_q = q_df["Total_OSS_Score"].dropna()
+    oss_n = n_df["Total_OSS_Score"].dropna()
+    present_q = q_df["Present_Percentage"].dropna()
+    present_n = n_df["Present_Percentage"].dropna()
+    oss_gap = bootstrap_diff(oss_q.values, oss_n.values) if len(oss_q) and len(oss_n) else None
+    present_gap = bootstrap_diff(present_q.values, present_n.values) if len(present_q) and len(present_n) else None
+
+    def card(title, body):
+        return dbc.Card(dbc.CardBody([html.Div(title, className="metric-title"), html.Div(body, className="metric-value")]), className="elegant-card")
+
+    cards = dbc.Row([
+        dbc.Col(card("Mean OSS (Quotate)", f"{oss_q.mean():.2f}"), md=3),
+        dbc.Col(card("Mean OSS (Non-Quotate)", f"{oss_n.mean():.2f}"), md=3),
+        dbc.Col(card("Mean Present% (Quotate)", f"{present_q.mean():.2f}%"), md=3),
+        dbc.Col(card("Mean Present% (Non-Quotate)", f"{present_n.mean():.2f}%"), md=3),
+    ], className="mb-3")
+
+    def p_note(gap):
+        return " (exact permutation test)" if gap["p_method"] == "permutation" else ""
+
+    summary = []
+    if oss_gap:
+        summary.append(f"OSS Δ (Quotate - Non): {oss_gap['diff_mean']:.2f} [95% CI {oss_gap['ci_low']:.2f}, {oss_gap['ci_high']:.2f}], p ≈ {oss_gap['p_value']:.3f}{p_note(oss_gap)}")
+    if present_gap:
+        summary.append(f"Present% Δ (Quotate - Non): {present_gap['diff_mean']:.2f} [95% CI {present_gap['ci_low']:.2f}, {present_gap['ci_high']:.2f}], p ≈ {present_gap['p_value']:.3f}{p_note(present_gap)}")
+    gap_text = html.Ul([html.Li(s) for s in summary], style={"color": "#0f172a", "fontSize": "0.95rem"})
+
+    box = px.box(df, x="Type", y="Total_OSS_Score", color="Type", points="all", title="OSS Score Distribution — Quotate vs Non-Quotate", hover_data=["Company", "Sector", "Year", "Severity"])
+    box.update_traces(marker_line_width=0, jitter=0.2)
+    box = polish_figure(box, height=600, margin={"t": 70, "b": 120})
+
+    # Per-KPI missing-rate gap: all KPIs bootstrapped together from the missingness matrix.
+    kpi_section = []
+    kpi_gap = None
+    if not kpi_df.empty:
+        kpi_gap = bootstrap_column_diffs(kpi_matrix.select(q_df["entity_id"].to_numpy()),
+                                         kpi_matrix.select(n_df["entity_id"].to_numpy()))
+    if kpi_gap is not None:
+        kpi_gap[["diff", "diff_mean", "ci_low", "ci_high"]] *= 100
+        kpi_gap["p_adjusted"] = adjust_pvalues(kpi_gap["p_value"].to_numpy(), "bh")
+        kpi_gap["KPI"] = kpi_df["KPI"].astype(str).to_numpy()
+        kpi_gap["Category"] = kpi_df["Category"].astype(str).to_numpy()
+        kpi_gap["Missing % (Quotate)"] = kpi_matrix.kpi_missing_rates(q_df["entity_id"].to_numpy())
+        kpi_gap["Missing % (Non-Quotate)"] = kpi_matrix.kpi_missing_rates(n_df["entity_id"].to_numpy())
+        ranked = kpi_gap.iloc[np.argsort(-kpi_gap["diff"].abs().to_numpy(), kind="stable")]
+
+        top = ranked.head(15).iloc[::-1]
+        gap_bar = go.Figure(go.Bar(
+            x=top["diff"],
+            y=top["KPI"],
+            orientation="h",
+            error_x=dict(type="data", symmetric=False, array=top["ci_high"] - top["diff"], arrayminus=top["diff"] - top["ci_low"]),
+            marker_color=np.where(top["p_adjusted"] < 0.05, np.where(top["diff"] > 0, "#e74c3c", "#27ae60"), "#b0b7c3"),
+            customdata=top[["Category", "Missing % (Quotate)", "Missing % (Non-Quotate)", "p_adjusted"]].to_numpy(),
+            hovertemplate="<b>%{y}</b><br>%{customdata[0]}<br>Missing (Quotate): %{customdata[1]:.1f}%"
+                          "<br>Missing (Non-Quotate): %{customdata[2]:.1f}%<br>Gap: %{x:+.1f} pp"
+                          "<br>Adjusted p: %{customdata[3]:.3f}<extra></extra>",
+        ))
+        gap_bar.update_layout(title="KPIs with the largest disclosure gap (Quotate − Non-Quotate missing rate)",
+                              xaxis_title="Missing-rate gap (percentage points)")
+        gap_bar = polish_figure(gap_bar, height=620, margin={"t": 70, "b": 60, "l": 320})
+
+        table_df = ranked.head(30)
+        table_df = pd.DataFrame({
+            "KPI": table_df["KPI"],
+            "Category": table_df["Category"],
+            "Missing % (Quotate)": table_df["Missing % (Quotate)"].round(1),
+            "Missing % (Non-Quotate)": table_df["Missing % (Non-Quotate)"].round(1),
+            "Gap (pp)": table_df["diff"].round(1),
+            "95% CI": [f"[{lo:+.1f}, {hi:+.1f}]" for lo, hi in zip(table_df["ci_low"], table_df["ci_high"])],
+            "Adjusted p": table_df["p_adjusted"].round(4),
         })
-        
-        bar_fig = px.bar(
-            bar_df_vis,
-            x='Missing Count',
-            y='KPI',
-            orientation='h',
-            color='Category',
-            hover_data={
-                'Missing %': ':.1f',
-                'OSS Points': ':.0f',
-                'Full Name': True,
-                'Category': True,
-                'KPI': False
-            },
-            title="Top 20 Most Missing KPIs by Frequency",
-            labels={'Missing Count': 'Number of Entries Missing', 'KPI': 'KPI Name'},
-            text='Missing Count'
-        )
-        
-        bar_fig.update_traces(
-            textposition='outside',
-            hovertemplate='<b>%{customdata[3]}</b>' +
-                          '<br>Missing in: %{x} entries' +
-                          '<br>Missing Rate: %{customdata[0]:.1f}%' +
-                          '<br>OSS Impact: %{customdata[1]:.0f}' +
-                          '<br>Category: %{customdata[2]}<extra></extra>',
-            marker=dict(line=dict(width=0.5, color='white'))
+        kpi_table = dash_table.DataTable(
+            columns=[{"name": c, "id": c} for c in table_df.columns],
+            data=table_df.to_dict("records"),
+            page_size=10,
+            style_table={"overflowX": "auto"},
+            style_cell={"padding": "8px", "textAlign": "left", "border": "none", "fontSize": "0.85rem",
+                        "whiteSpace": "normal", "height": "auto"},
+            style_header={"fontWeight": "700", "backgroundColor": "#eef1f8", "border": "none", "color": "#0f766e"},
         )
-        
-        bar_fig.update_layout(
-            height=650,
-            xaxis_title='Number of Company-Year Entries Missing',
-            yaxis_title='',
-            showlegend=True,
-            legend=dict(
-                orientation="v",
-                yanchor="top",
-                y=0.99,
-                xanchor="right",
-                x=0.99,
-                bgcolor="rgba(255,255,255,0.8)",
-                bordercolor="rgba(0,0,0,0.1)",
-                borderwidth=1
+        kpi_section = [
+            html.Hr(style={"margin": "16px 0"}),
+            dcc.Graph(figure=gap_bar, config={"displayModeBar": False}),
+            kpi_table,
+            html.Div(
+                "Positive gap = listed companies omit the KPI more often. Red/green bars differ significantly "
+                "after Benjamini-Hochberg correction; grey bars do not.",
+                style={"marginTop": "12px", "color": "#444"}
             ),
-            hovermode='closest',
-            margin={"t": 60, "b": 80, "l": 200, "r": 40}
-        )
-        
-        bar_fig = polish_figure(bar_fig, height=650, margin={"t": 60, "b": 80, "l": 200, "r": 200})
-        
-        radar_fig = go.Figure()
-        radar_fig.add_trace(go.Scatterpolar(
-            r=missing_counts,
-            theta=kpi_labels,
-            fill='toself',
-            name='Missing Count',
-            line=dict(color='#0f766e', width=2.5),
-            fillcolor='rgba(15, 118, 110, 0.25)',
-            hovertemplate='<b>%{theta}</b>' +
-                          '<br>Missing: %{r} entries' +
-                          '<br>Rate: %{customdata[0]:.1f}%' +
-                          '<br>OSS Points: %{customdata[1]:.0f}<extra></extra>',
-            customdata=np.column_stack((missing_pcts, total_oss_points)),
-            marker=dict(size=8, color='#e74c3c')
+        ]
+    return html.Div([cards, gap_text, dcc.Graph(figure=box, config={"displayModeBar": False})] + kpi_section)
+
+@tab_view("tab-pairwise", inputs=("filters", "sortby"))
+def pairwise_tab(data, df):
+    if df.empty:
+        return html.Div("No data available for pairwise tests.", style={"color": "#777", "padding": "20px"})
+    oss = df[["Sector", "Year", "Total_OSS_Score"]].dropna()
+    sections = []
+    significant = []
+    for column, name in (("Sector", "sectors"), ("Year", "years")):
+        groups = {label: values.to_numpy() for label, values in oss.groupby(column, observed=True)["Total_OSS_Score"]}
+        pairs = pairwise_bootstrap(groups)
+        if pairs.empty:
+            sections.append(html.P(f"Need at least two {name} to compare.", style={"color": "#777"}))
+            continue
+        labels = list(groups)
+        sections.append(dcc.Graph(
+            figure=pairwise_heatmap(pairs, labels, f"Pairwise OSS differences between {name} (* = significant)"),
+            config={"displayModeBar": False},
         ))
-        
-        radar_fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, max(missing_counts) * 1.2] if missing_counts else [0, 10],
-                    showticklabels=True,
-                    ticks='outside',
-                    gridcolor='rgba(0,0,0,0.1)',
-                    tickfont=dict(size=10)
-                ),
-                angularaxis=dict(
-                    rotation=90,
-                    direction='clockwise',
-                    gridcolor='rgba(0,0,0,0.08)',
-                    tickfont=dict(size=10)
-                ),
-                bgcolor='rgba(240,245,245,0.3)'
-            ),
-            showlegend=False,
-            title=dict(
-                text="Radar View: Distribution of Missing KPIs",
-                font=dict(size=16, family="Inter", color="#0b1220")
-            ),
-            height=700,
-            font=dict(size=11, family="Inter", color="#0b1220"),
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            margin={"t": 80, "b": 40, "l": 40, "r": 40}
-        )
-        
-        rate_df = pd.DataFrame({
-            'KPI': kpi_labels_full[:10], 
-            'Missing Count': missing_counts[:10],
-            'Missing Rate (%)': [f"{p:.1f}" for p in missing_pcts[:10]],
-            'Category': categories[:10],
-            'OSS Impact': [f"{p:.0f}" for p in total_oss_points[:10]]
+        hits = pairs[pairs["significant"]].assign(Comparison=column)
+        significant.append(hits)
+
+    table_df = pd.concat(significant) if significant else pd.DataFrame()
+    if not table_df.empty:
+        table_df = table_df.sort_values("p_adjusted", kind="stable")
+        table_df = pd.DataFrame({
+            "Comparison": table_df["Comparison"],
+            "A": table_df["A"].astype(str),
+            "B": table_df["B"].astype(str),
+            "Δ mean OSS": table_df["diff_mean"].round(2),
+            "95% CI": [f"[{lo:.2f}, {hi:.2f}]" for lo, hi in zip(table_df["ci_low"], table_df["ci_high"])],
+            "Adjusted p": table_df["p_adjusted"].round(4),
         })
-        
-        rate_table = dash_table.DataTable(
-            columns=[{"name": c, "id": c} for c in rate_df.columns],
-            data=rate_df.to_dict("records"),
-            style_table={"overflowX": "auto", "marginTop": "20px"},
-            style_cell={"padding": "10px", "textAlign": "left", "border": "none", "fontSize": "0.9rem"},
+        detail = dash_table.DataTable(
+            columns=[{"name": c, "id": c} for c in table_df.columns],
+            data=table_df.to_dict("records"),
+            page_size=15,
+            style_table={"overflowX": "auto"},
+            style_cell={"padding": "8px", "textAlign": "center", "border": "none", "fontSize": "0.9rem"},
             style_header={"fontWeight": "700", "backgroundColor": "#eef1f8", "border": "none", "color": "#0f766e"},
-            style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "rgba(15,118,110,0.03)"}]
         )
-        
-        explanation = dbc.Card(
-            dbc.CardBody([
-                html.H6("How to Read This Tab", style={"fontWeight": "700", "marginBottom": "12px"}),
-                html.Ul([
-                    html.Li([html.Strong("Missing Count:"), " Number of company-year entries missing this KPI"]),
-                    html.Li([html.Strong("Missing Rate (%):"), " Percentage of selected entries missing this KPI"]),
-                    html.Li([html.Strong("OSS Impact:"), " Total severity points from missing this KPI across entries"]),
-                    html.Li([html.Strong("Top 20:"), " Sorted by frequency—these are the most commonly missing KPIs"])
-                ], style={"color": "#5b6475", "fontSize": "0.9rem"}),
-                html.P("Use these insights to identify KPIs that most companies struggle to report, indicating potential areas for targeted improvement or industry-wide guidance.", 
-                       style={"marginTop": "12px", "color": "#5b6475", "fontSize": "0.85rem", "fontStyle": "italic"})
-            ]),
-            className="elegant-card"
-        )
-        
-        return html.Div([
-            summary_cards,
-            html.Hr(style={"margin": "20px 0", "borderColor": "#e5e7eb"}),
-            dcc.Graph(figure=bar_fig, config={"displayModeBar": True}),
-            html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
-            rate_table,
-            html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
-            dcc.Graph(figure=radar_fig, config={"displayModeBar": True}),
-            html.Hr(style={"margin": "30px 0", "borderColor": "#e5e7eb"}),
-            explanation
-        ])
-
-    # TAB 7: 
-    if tab == "tab-data":
-        sub = df[["Company", "Sector", "Type", "Year", "Total_OSS_Score", "Severity", "Total_Missing_KPIs", "Transparency_Percentage", "Present_Percentage"]].copy()
-        sub = sub.fillna("N/A")
-        numeric_cols = ["Total_OSS_Score", "Total_Missing_KPIs", "Transparency_Percentage", "Present_Percentage"]
-        for col in numeric_cols:
-            sub[col] = sub[col].apply(lambda x: "N/A" if x == 0 else x)
-        table = dash_table.DataTable(columns=[{"name": c, "id": c} for c in sub.columns], data=sub.to_dict("records"), page_size=12, sort_action="native", style_table={"overflowX": "auto"}, style_cell={"padding": "12px", "textAlign": "left", "border": "none"}, style_header={"fontWeight": "800", "backgroundColor": "#eef1f8", "border": "none"}, style_data_conditional=[{"if": {"row_index": "odd"}, "backgroundColor": "rgba(124,93,250,0.03)"}])
-        return table
-
-    # TAB 8: 
-    if tab == "tab-about":
-        return dbc.Card(dbc.CardBody([
+    else:
+        detail = html.P("No pair differs significantly after correction.", style={"color": "#777"})
+
+    method = {"bh": "Benjamini-Hochberg", "holm": "Holm"}.get(DEFAULT_CORRECTION, DEFAULT_CORRECTION)
+    explainer = html.Div(
+        f"Each cell is the bootstrap difference in mean OSS (row minus column). Stars mark pairs whose "
+        f"{method}-adjusted p-value is below 0.05.",
+        style={"marginTop": "12px", "color": "#444"}
+    )
+    return html.Div(sections + [
+        html.H5("Significant pairs", style={"fontWeight": "700", "margin": "16px 0 12px"}),
+        detail,
+        explainer,
+    ])
+
+def about_tab():
+    # Filter-independent: rendered once into ABOUT_CONTENT and served as-is.
+    return dbc.Card(dbc.CardBody([
+        html.Div([
+            html.H3("The Blind Spot", style={"fontWeight": "800", "color": "#0b1220"}),
+            html.H5("When Missing Data Speaks Louder than Numbers", style={"color": "#5b6475", "marginBottom": "24px"}),
+            
             html.Div([
-                html.H3("The Blind Spot", style={"fontWeight": "800", "color": "#0b1220"}),
-                html.H5("When Missing Data Speaks Louder than Numbers", style={"color": "#5b6475", "marginBottom": "24px"}),
-                
-                html.Div([
-                    html.P([
-                        "While many analyze the data present in Non-Financial Declarations (DNFs)—such as pay gaps or % of women in STEM—",
-                        html.Strong("we analyze what is missing."),
-                        " Our goal is to visualize the 'information gap,' transforming the absence of data into an indicator of transparency and real commitment."
-                    ]),
-                    html.Blockquote(
-                        "\"What isn't measured, isn't managed. What isn't communicated, often doesn't exist. We make the invisible visible.\"",
-                        style={"borderLeft": "4px solid #0f766e", "paddingLeft": "15px", "margin": "20px 0", "fontStyle": "italic", "color": "#444"}
-                    )
-                ], style={"marginBottom": "35px"}),
+                html.P([
+                    "While many analyze the data present in Non-Financial Declarations (DNFs)—such as pay gaps or % of women in STEM—",
+                    html.Strong("we analyze what is missing."),
+                    " Our goal is to visualize the 'information gap,' transforming the absence of data into an indicator of transparency and real commitment."
+                ]),
+                html.Blockquote(
+                    "\"What isn't measured, isn't managed. What isn't communicated, often doesn't exist. We make the invisible visible.\"",
+                    style={"borderLeft": "4px solid #0f766e", "paddingLeft": "15px", "margin": "20px 0", "fontStyle": "italic", "color": "#444"}
+                )
+            ], style={"marginBottom": "35px"}),
 
-                html.Hr(style={"borderColor": "#e5e7eb"}),
+            html.Hr(style={"borderColor": "#e5e7eb"}),
 
-                html.H5("Methodology: The OSS System", style={"fontWeight": "700", "color": "#0f766e", "marginTop": "25px"}),
-                html.P("The analysis is based on a checklist of KPIs derived from European directives and ESG standards. We utilize the Omission Severity Score (OSS) to quantify opacity."),
-                
+            html.H5("Methodology: The OSS System", style={"fontWeight": "700", "color": "#0f766e", "marginTop": "25px"}),
+            html.P("The analysis is based on a checklist of KPIs derived from European directives and ESG standards. We utilize the Omission Severity Score (OSS) to quantify opacity."),
+            
+            dbc.Row([
+                dbc.Col([
+                    html.Div("1. Binary Collection", style={"fontWeight": "700"}),
+                    html.P("Is the KPI present? Yes = 0 points, No = 1 point.", style={"fontSize": "0.9rem", "color": "#5b6475"})
+                ], md=4),
+                dbc.Col([
+                    html.Div("2. Weighted Severity", style={"fontWeight": "700"}),
+                    html.P("Not all omissions are equal. Missing a 'Gender Pay Gap' metric (Weight 3) is more severe than missing a generic training metric (Weight 1).", style={"fontSize": "0.9rem", "color": "#5b6475"})
+                ], md=4),
+                dbc.Col([
+                    html.Div("3. Calculation", style={"fontWeight": "700"}),
+                    html.P("OSS = Σ (Missing KPI × Weight). Max Score = 185.", style={"fontSize": "0.9rem", "color": "#5b6475"})
+                ], md=4),
+            ], className="mb-4"),
+
+            html.H6("The Severity Scale", style={"fontWeight": "700", "marginTop": "20px"}),
+            html.Div([
+                # Header
+                dbc.Row([
+                    dbc.Col("OSS Score", width=2, style={"fontWeight": "700", "color": "#0f766e"}),
+                    dbc.Col("Level", width=3, style={"fontWeight": "700", "color": "#0f766e"}),
+                    dbc.Col("Interpretation", width=7, style={"fontWeight": "700", "color": "#0f766e"}),
+                ], className="mb-2", style={"borderBottom": "1px solid #e5e7eb", "paddingBottom": "8px"}),
+                # Rows
+                dbc.Row([
+                    dbc.Col("0 - 31", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Trasparente", style={"backgroundColor": "#27ae60", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Minimal omissions. The company communicates almost everything.", width=7),
+                ], className="mb-2"),
+                dbc.Row([
+                    dbc.Col("32 - 62", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Bassa", style={"backgroundColor": "#2980b9", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Low omission level. Few gaps.", width=7),
+                ], className="mb-2"),
+                dbc.Row([
+                    dbc.Col("63 - 93", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Moderata", style={"backgroundColor": "#f1c40f", "color": "black", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Moderate. Several important KPIs are missing.", width=7),
+                ], className="mb-2"),
                 dbc.Row([
-                    dbc.Col([
-                        html.Div("1. Binary Collection", style={"fontWeight": "700"}),
-                        html.P("Is the KPI present? Yes = 0 points, No = 1 point.", style={"fontSize": "0.9rem", "color": "#5b6475"})
-                    ], md=4),
-                    dbc.Col([
-                        html.Div("2. Weighted Severity", style={"fontWeight": "700"}),
-                        html.P("Not all omissions are equal. Missing a 'Gender Pay Gap' metric (Weight 3) is more severe than missing a generic training metric (Weight 1).", style={"fontSize": "0.9rem", "color": "#5b6475"})
-                    ], md=4),
-                    dbc.Col([
-                        html.Div("3. Calculation", style={"fontWeight": "700"}),
-                        html.P("OSS = Σ (Missing KPI × Weight). Max Score = 185.", style={"fontSize": "0.9rem", "color": "#5b6475"})
-                    ], md=4),
-                ], className="mb-4"),
-
-                html.H6("The Severity Scale", style={"fontWeight": "700", "marginTop": "20px"}),
-                html.Div([
-                    # Header
-                    dbc.Row([
-                        dbc.Col("OSS Score", width=2, style={"fontWeight": "700", "color": "#0f766e"}),
-                        dbc.Col("Level", width=3, style={"fontWeight": "700", "color": "#0f766e"}),
-                        dbc.Col("Interpretation", width=7, style={"fontWeight": "700", "color": "#0f766e"}),
-                    ], className="mb-2", style={"borderBottom": "1px solid #e5e7eb", "paddingBottom": "8px"}),
-                    # Rows
-                    dbc.Row([
-                        dbc.Col("0 - 31", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Trasparente", style={"backgroundColor": "#27ae60", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Minimal omissions. The company communicates almost everything.", width=7),
-                    ], className="mb-2"),
-                    dbc.Row([
-                        dbc.Col("32 - 62", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Bassa", style={"backgroundColor": "#2980b9", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Low omission level. Few gaps.", width=7),
-                    ], className="mb-2"),
-                    dbc.Row([
-                        dbc.Col("63 - 93", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Moderata", style={"backgroundColor": "#f1c40f", "color": "black", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Moderate. Several important KPIs are missing.", width=7),
-                    ], className="mb-2"),
-                    dbc.Row([
-                        dbc.Col("94 - 124", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Grave", style={"backgroundColor": "#e67e22", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Severe. Significant omissions including essential KPIs.", width=7),
-                    ], className="mb-2"),
-                    dbc.Row([
-                        dbc.Col("125 - 155", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Critica", style={"backgroundColor": "#e74c3c", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Critical. Fundamental and structural KPIs are missing.", width=7),
-                    ], className="mb-2"),
-                    dbc.Row([
-                        dbc.Col("156 - 185", width=2, style={"fontWeight": "600"}),
-                        dbc.Col(html.Span("Estrema", style={"backgroundColor": "#6c3483", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
-                        dbc.Col("Extreme. The company omites almost all critical areas.", width=7),
-                    ], className="mb-2"),
-                ], style={"backgroundColor": "#f8fafc", "padding": "20px", "borderRadius": "12px"}),
-
-                html.Div([
-                    html.H6("Key Areas Monitored", style={"fontWeight": "700", "marginTop": "25px"}),
-                    html.Ul([
-                        html.Li("Board & Governance (e.g., % women in committees)"),
-                        html.Li("Management (e.g., % women in top management)"),
-                        html.Li("Pay Equity (e.g., Adjusted/Unadjusted Pay Gap, Bonus Gap)"),
-                        html.Li("STEM & Strategy (e.g., % women in R&D, ICT)"),
-                        html.Li("Work-Life Balance & Welfare (e.g., Parental leave beyond legal minimum)"),
-                        html.Li("Inclusion Culture (e.g., Anti-bias training, Diversity Managers)")
-                    ], style={"columns": "2", "color": "#5b6475"})
-                ])
+                    dbc.Col("94 - 124", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Grave", style={"backgroundColor": "#e67e22", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Severe. Significant omissions including essential KPIs.", width=7),
+                ], className="mb-2"),
+                dbc.Row([
+                    dbc.Col("125 - 155", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Critica", style={"backgroundColor": "#e74c3c", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Critical. Fundamental and structural KPIs are missing.", width=7),
+                ], className="mb-2"),
+                dbc.Row([
+                    dbc.Col("156 - 185", width=2, style={"fontWeight": "600"}),
+                    dbc.Col(html.Span("Estrema", style={"backgroundColor": "#6c3483", "color": "white", "padding": "2px 8px", "borderRadius": "12px", "fontSize": "0.85rem"}), width=3),
+                    dbc.Col("Extreme. The company omites almost all critical areas.", width=7),
+                ], className="mb-2"),
+            ], style={"backgroundColor": "#f8fafc", "padding": "20px", "borderRadius": "12px"}),
+
+            html.Div([
+                html.H6("Key Areas Monitored", style={"fontWeight": "700", "marginTop": "25px"}),
+                html.Ul([
+                    html.Li("Board & Governance (e.g., % women in committees)"),
+                    html.Li("Management (e.g., % women in top management)"),
+                    html.Li("Pay Equity (e.g., Adjusted/Unadjusted Pay Gap, Bonus Gap)"),
+                    html.Li("STEM & Strategy (e.g., % women in R&D, ICT)"),
+                    html.Li("Work-Life Balance & Welfare (e.g., Parental leave beyond legal minimum)"),
+                    html.Li("Inclusion Culture (e.g., Anti-bias training, Diversity Managers)")
+                ], style={"columns": "2", "color": "#5b6475"})
             ])
-        ]), className="elegant-card")
-    
-    # TAB 9: 
-    if tab == "tab-cat-impact":
-        if kpi_df.empty or df.empty:
-            return html.Div("No KPI data available.", style={"color": "#777", "padding": "20px"})
-
-        categories = sorted(kpi_df["Category"].unique())
-        records = []
-        total_possible = 0.0
-        total_missing_weight = 0.0
-
-        for cat in categories:
-            kpis_cat = kpi_df[kpi_df["Category"] == cat]
-            missing_weight_sum = 0.0
-            possible_weight_sum = 0.0
-            for _, kpi_row in kpis_cat.iterrows():
-                weight = kpi_row.get("Weight", 0) or 0
-                possible_weight_sum += weight * len(df)
-                missing_count = 0
-                for _, company_row in df.iterrows():
-                    val_col = f"{company_row['Company']}_value"
-                    if val_col in kpi_row.index and kpi_row[val_col] == 1:
-                        missing_count += 1
-                missing_weight_sum += weight * missing_count
-            if possible_weight_sum > 0:
-                rate_pct = (missing_weight_sum / possible_weight_sum * 100) if possible_weight_sum else 0
-                records.append({
-                    "category": cat,
-                    "missing_weight": missing_weight_sum,
-                    "possible_weight": possible_weight_sum,
-                    "rate_pct": rate_pct
-                })
-                total_possible += possible_weight_sum
-                total_missing_weight += missing_weight_sum
-
-        if not records:
-            return html.Div("No weighted data to display.", style={"color": "#777", "padding": "20px"})
-
-        cat_df = pd.DataFrame(records)
-        
-        overall_rate = (total_missing_weight / total_possible * 100) if total_possible > 0 else 0
-        
-        top_row = cat_df.sort_values("rate_pct", ascending=True).iloc[0]
-        
-        cards = dbc.Row([
-            dbc.Col(card("Top gap category", f"{top_row['category']} ({top_row['rate_pct']:.1f}%)"), md=3),
-            dbc.Col(card("Categories covered", f"{len(cat_df)}"), md=3),
-        ], className="mb-3")
-
-        labels = ["All Categories"]
-        parents = [""]
-        values = [max(total_missing_weight, 0.0001)]
-        colors = [overall_rate]
-        customdata = [[total_missing_weight, total_possible, overall_rate, 100.0]]
-        for _, rec in cat_df.iterrows():
-            labels.append(rec["category"])
-            parents.append("All Categories")
-            values.append(rec["missing_weight"] if rec["missing_weight"] > 0 else 0.0001)
-            colors.append(rec["rate_pct"])
-            customdata.append([rec["missing_weight"], rec["possible_weight"], rec["rate_pct"], rec["share_of_missing"]])
-
-        treemap = go.Figure(go.Treemap(
-            labels=labels,
-            parents=parents,
-            values=values,
-            marker=dict(colors=colors, colorscale="Reds", colorbar=dict(title="Weighted Missing %"), line=dict(width=0.5, color="white")),
-            customdata=customdata,
-            hovertemplate="<b>%{label}</b><br>Weighted missing: %{customdata[0]:.2f}"
-                          "<br>Possible weight: %{customdata[1]:.2f}"
-                          "<br>Weighted missing rate: %{customdata[2]:.2f}%"
-                          "<br>Share of total missing: %{customdata[3]:.1f}%<extra></extra>"
-        ))
-        treemap.update_layout(title="Weighted Category Impact — Contribution to OSS via KPI Weights", height=640)
-        treemap = polish_figure(treemap, height=640, margin={"t": 80, "b": 40})
-
-        bar_df = cat_df.sort_values("rate_pct", ascending=True)
-        bar = px.bar(
-            bar_df,
-            x="rate_pct",
-            y="category",
-            orientation="h",
-            color="share_of_missing",
-            color_continuous_scale="Reds",
-            labels={"rate_pct": "Weighted missing %", "category": "Category", "share_of_missing": "Share of total missing %"},
-            hover_data={
-                "missing_weight": ":.2f",
-                "possible_weight": ":.2f",
-                "share_of_missing": ":.1f",
-                "rate_pct": ":.1f",
-                "category": False
-            },
-            title="Weighted missing rate by category"
-        )
-        bar.update_traces(texttemplate="%{text:.1f}%", textposition="outside")
-        bar = polish_figure(bar, height=520, margin={"t": 70, "b": 80, "l": 90, "r": 40})
+        ])
+    ]), className="elegant-card")
 
-        explainer = html.Div(
-            "Weights come from the KPI checklist. Bars rank categories by weighted omission rate; color shows share of total missing weight.",
-            style={"marginTop": "12px", "color": "#444"}
-        )
+ABOUT_CONTENT = about_tab()
 
-        return html.Div([
-            cards,
-            dcc.Graph(figure=bar, config={"displayModeBar": False}),
-            html.Hr(style={"margin": "16px 0"}),
-            dcc.Graph(figure=treemap, config={"displayModeBar": True}),
-            explainer
-        ])
+# ---------------------
+# Tab callbacks
+# ---------------------
+# The tab bar only mounts the visible tab; each view has its own callback on
+# ``filter-state``, so a filter change recomputes the visible tab and nothing else.
+def build_tab(data, tab, years, types, sectors, companies, severities, sortby):
+    if data.companies.empty:
+        return html.Div("No data loaded. Please ensure Excel files are present.", className="p-3 text-muted")
 
-    # TAB 10:
-    if tab == "tab-gap":
-        if "Type" not in df.columns:
-            return html.Div("No data available for gap analysis.", style={"color": "#777", "padding": "20px"})
-        q_df = df[df["Type"].str.lower().str.contains("quotate", na=False)]
-        n_df = df[df["Type"].str.lower().str.contains("non-quotate", na=False)]
-        if q_df.empty or n_df.empty:
-            return html.Div("Need both Quotate and Non-Quotate groups to compare.", style={"color": "#777", "padding": "20px"})
-        oss_q = q_df["Total_OSS_Score"].dropna()
-        oss_n = n_df["Total_OSS_Score"].dropna()
-        present_q = q_df["Present_Percentage"].dropna()
-        present_n = n_df["Present_Percentage"].dropna()
-        oss_gap = bootstrap_diff(oss_q.values, oss_n.values) if len(oss_q) and len(oss_n) else None
-        present_gap = bootstrap_diff(present_q.values, present_n.values) if len(present_q) and len(present_n) else None
-
-        def card(title, body):
-            return dbc.Card(dbc.CardBody([html.Div(title, className="metric-title"), html.Div(body, className="metric-value")]), className="elegant-card")
-
-        cards = dbc.Row([
-            dbc.Col(card("Mean OSS (Quotate)", f"{oss_q.mean():.2f}"), md=3),
-            dbc.Col(card("Mean OSS (Non-Quotate)", f"{oss_n.mean():.2f}"), md=3),
-            dbc.Col(card("Mean Present% (Quotate)", f"{present_q.mean():.2f}%"), md=3),
-            dbc.Col(card("Mean Present% (Non-Quotate)", f"{present_n.mean():.2f}%"), md=3),
-        ], className="mb-3")
-
-        summary = []
-        if oss_gap:
-            summary.append(f"OSS Δ (Quotate - Non): {oss_gap['diff_mean']:.2f} [95% CI {oss_gap['ci_low']:.2f}, {oss_gap['ci_high']:.2f}], p ≈ {oss_gap['p_value']:.3f}")
-        if present_gap:
-            summary.append(f"Present% Δ (Quotate - Non): {present_gap['diff_mean']:.2f} [95% CI {present_gap['ci_low']:.2f}, {present_gap['ci_high']:.2f}], p ≈ {present_gap['p_value']:.3f}")
-        gap_text = html.Ul([html.Li(s) for s in summary], style={"color": "#0f172a", "fontSize": "0.95rem"})
-
-        box = px.box(df, x="Type", y="Total_OSS_Score", color="Type", points="all", title="OSS Score Distribution — Quotate vs Non-Quotate", hover_data=["Company", "Sector", "Year", "Severity"])
-        box.update_traces(marker_line_width=0, jitter=0.2)
-        box = polish_figure(box, height=600, margin={"t": 70, "b": 120})
-        return html.Div([cards, gap_text, dcc.Graph(figure=box, config={"displayModeBar": False})])
+    df = filtered_view(data, years, types, sectors, companies, severities, sortby)
 
-    # TAB CHAT:
+    if df.empty:
+        return html.Div("No companies match the selected filters.", style={"color": "#777"})
+
+    return TAB_VIEWS[tab](data, df)
+
+def static_tab(tab):
+    if tab == "tab-about":
+        return ABOUT_CONTENT
     if tab == "tab-chat":
         return chatbot_container
-
     return html.Div("Tab not implemented.", style={"color": "#777"})
 
+def render_tab(tab, years=None, types=None, sectors=None, companies=None, severities=None, sortby=None):
+    """Contents of ``tab`` for the given filters; view tabs go through their own figure cache."""
+    if tab not in TAB_VIEWS:
+        return static_tab(tab)
+    inputs = TAB_INPUTS[tab]
+    if "filters" not in inputs:
+        years = types = sectors = companies = severities = None
+    if "sortby" not in inputs:
+        sortby = None
+    data = store.current()
+    if data.companies.empty:
+        return build_tab(data, tab, years, types, sectors, companies, severities, sortby)
+    parts = {
+        "filters": (normalize_selection(years), normalize_selection(types), normalize_selection(sectors),
+                    normalize_selection(companies), normalize_selection(severities)),
+        "sortby": sortby,
+    }
+    key = (FIGURE_CACHE_TOKEN, data.source_key or data.version, *(parts[name] for name in inputs))
+    cache = figure_caches[tab]
+    payload = cache.get(key)
+    if payload is None:
+        payload = json.dumps(build_tab(data, tab, years, types, sectors, companies, severities, sortby),
+                             cls=plotly.utils.PlotlyJSONEncoder)
+        cache.put(key, payload)
+    # Serialized components are plain {type, namespace, props} dicts, which Dash renders as-is.
+    return json.loads(payload)
+
+@app.callback(
+    Output("tab-content", "children"),
+    Input("main-tabs", "value")
+)
+def route_tab(tab):
+    # View tabs get an empty container that their own callback fills in.
+    if tab in TAB_VIEWS:
+        return html.Div(id=f"{tab}-view")
+    return static_tab(tab)
+
+def register_tab_callback(tab):
+    inputs = TAB_INPUTS[tab]
+
+    @app.callback(
+        Output(f"{tab}-view", "children"),
+        *[Input(*VIEW_INPUTS[name]) for name in inputs]
+    )
+    def update_view(*values):
+        values = dict(zip(inputs, values))
+        return render_tab(tab, sortby=values.get("sortby"), **(values.get("filters") or {}))
+    return update_view
+
+for _tab in TAB_VIEWS:
+    register_tab_callback(_tab)
+
+@app.callback(
+    Output("data-table", "data"),
+    Output("data-table", "page_count"),
+    Output("data-table", "page_current"),
+    Input("data-table", "page_current"),
+    Input("data-table", "page_size"),
+    Input("data-table", "sort_by"),
+    Input("data-table", "filter_query"),
+    Input("sortby-filter", "value"),
+    State("filter-state", "data")
+)
+def page_data_table(page_current, page_size, sort_by, filter_query, sortby, filters):
+    data = store.current()
+    if data.companies.empty:
+        return [], 1, 0
+    if ctx.triggered_id == "sortby-filter":
+        page_current = 0
+    positions = table_order(data, sortby=sortby, filter_query=filter_query, sort_by=sort_by, **(filters or {}))
+    page_size = page_size or TABLE_PAGE_SIZE
+    page_count = max(1, math.ceil(len(positions) / page_size))
+    # A narrower filter can leave the current page past the end.
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+    return table_page(data, positions[start:start + page_size]), page_count, page_current
+
+app.clientside_callback(
+    ClientsideFunction(namespace="blindspot", function_name="ossFigure"),
+    Output("oss-graph", "figure"),
+    Input("oss-records", "data"),
+    Input("sortby-filter", "value"),
+    Input("oss-severity-toggle", "value")
+)
+
+
 # ---------------------
 # Flask route
 # ---------------------
+@app.server.route('/cache-stats')
+def cache_stats():
+    return jsonify({"dataset_version": store.version, "caches": [view_cache.stats(), table_order_cache.stats(), bootstrap_cache.stats()]
+                    + [stats for cache in figure_caches.values() for stats in cache.stats()]})
+
 @app.server.route('/download_pdf/<pdf_id>')
 def download_pdf(pdf_id):
 
@@ -1560,17 +1759,9 @@ def generate_and_download_report(n_clicks, years, types, sectors, companies, sev
         return None, ""
     
     try:
-        df = companies_df.copy()
-        if years:
-            df = df[df["Year"].isin(years)]
-        if types:
-            df = df[df["Type"].isin(types)]
-        if sectors:
-            df = df[df["Sector"].isin(sectors)]
-        if companies:
-            df = df[df["Company"].isin(companies)]
-        if severities:
-            df = df[df["Severity"].isin(severities)]
+        data = store.current()
+        kpi_df = data.kpis
+        df = filtered_view(data, years, types, sectors, companies, severities)
         
         if df.empty:
             return None, "❌ No data selected"
@@ -1649,17 +1840,9 @@ def handle_chat(send_clicks, n_submit, user_input, conversation_history,
         return dash.no_update, dash.no_update, dash.no_update
     
     # Filter data based on current filters
-    df = companies_df.copy()
-    if years:
-        df = df[df["Year"].isin(years)]
-    if types:
-        df = df[df["Type"].isin(types)]
-    if sectors:
-        df = df[df["Sector"].isin(sectors)]
-    if companies:
-        df = df[df["Company"].isin(companies)]
-    if severities:
-        df = df[df["Severity"].isin(severities)]
+    data = store.current()
+    kpi_df = data.kpis
+    df = filtered_view(data, years, types, sectors, companies, severities)
     
     if df.empty:
         error_msg = html.Div([
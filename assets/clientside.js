@@ -0,0 +1,77 @@
+// Clientside callbacks (see the clientside_callback registrations in analyzer.py).
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    blindspot: {
+        // Bundle the sidebar filters into the filter-state store read by every tab view.
+        filterState: function(years, types, sectors, companies, severities) {
+            return {
+                years: years || [], types: types || [], sectors: sectors || [],
+                companies: companies || [], severities: severities || []
+            };
+        },
+
+        // Build the Overview (OSS) bar chart from the records shipped by the server,
+        // applying the Sort By control and the severity toggles without a round trip.
+        ossFigure: function(payload, sortby, severities) {
+            if (!payload) {
+                return window.dash_clientside.no_update;
+            }
+            var r = payload.records;
+            var shown = new Set(severities || []);
+            var rows = [];
+            for (var i = 0; i < r.Company.length; i++) {
+                if (shown.has(r.Severity[i])) {
+                    rows.push(i);
+                }
+            }
+
+            // Same orderings as sort_companies() on the server.
+            var compare = function(a, b) { return a < b ? -1 : (a > b ? 1 : 0); };
+            var byCompany = function(i, j) { return compare(r.Company[i], r.Company[j]); };
+            var byScore = function(i, j) { return r.Total_OSS_Score[i] - r.Total_OSS_Score[j]; };
+            if (sortby === "severity-asc") {
+                rows.sort(function(i, j) { return byScore(i, j) || byCompany(i, j); });
+            } else if (sortby === "severity-desc") {
+                rows.sort(function(i, j) { return byScore(j, i) || byCompany(i, j); });
+            } else if (sortby === "company-az") {
+                rows.sort(byCompany);
+            } else if (sortby === "company-za") {
+                rows.sort(function(i, j) { return byCompany(j, i); });
+            }
+
+            // One trace per severity in order of first appearance, as plotly express does.
+            var traces = {};
+            var order = [];
+            var categories = [];
+            var seen = new Set();
+            rows.forEach(function(i) {
+                var severity = r.Severity[i];
+                if (!traces[severity]) {
+                    traces[severity] = {
+                        type: "bar", name: severity, legendgroup: severity, showlegend: true, orientation: "v",
+                        x: [], y: [], text: [], customdata: [], textposition: "outside",
+                        marker: {color: payload.colors[severity], opacity: 0.92, line: {width: 0}},
+                        hovertemplate: "Severity=" + severity + "<br>Company=%{x}<br>Total_OSS_Score=%{text}" +
+                                       "<br>Sector=%{customdata[0]}<br>Type=%{customdata[1]}<br>Year=%{customdata[2]}<extra></extra>"
+                    };
+                    order.push(severity);
+                }
+                var trace = traces[severity];
+                trace.x.push(r.Company[i]);
+                trace.y.push(r.Total_OSS_Score[i]);
+                trace.text.push(r.Total_OSS_Score[i]);
+                trace.customdata.push([r.Sector[i], r.Type[i], r.Year[i]]);
+                if (!seen.has(r.Company[i])) {
+                    seen.add(r.Company[i]);
+                    categories.push(r.Company[i]);
+                }
+            });
+
+            // Pin the x order so the sort holds across severity traces.
+            var xaxis = Object.assign({}, payload.layout.xaxis, {categoryorder: "array", categoryarray: categories});
+            return {
+                data: order.map(function(severity) { return traces[severity]; }),
+                layout: Object.assign({}, payload.layout, {xaxis: xaxis})
+            };
+        }
+    }
+});
@@ -0,0 +1,122 @@
+"""Benchmark the compact ``companies_df`` schema against plain string/int64/float64 columns.
+
+Usage: python benchmarks/bench_company_schema.py [--rows 10000 100000 1000000]
+
+For each size it reports memory (deep) and the time of the dashboard's
+filter chain (Year / Type / Sector / Severity / Company selections) and of a
+Sector groupby, with ``isin`` on the wide frame versus ``column_mask`` on the
+compact one.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import compact_companies  # noqa: E402
+
+SEVERITIES = ["N/A", "Trasparente", "Bassa", "Moderata", "Grave", "Critica", "Estrema"]
+
+
+def synthetic(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    n_companies = max(1, n_rows // 4)
+    scores = rng.integers(0, 185, n_rows).astype(float)
+    missing = rng.integers(0, 50, n_rows)
+    return pd.DataFrame({
+        "entity_id": np.arange(n_rows),
+        "Company": pd.Series([f"Company {i}" for i in rng.integers(0, n_companies, n_rows)], dtype="str"),
+        "Sector": pd.Series([f"Sector {i}" for i in rng.integers(0, 20, n_rows)], dtype="str"),
+        "Type": pd.Series(np.where(rng.random(n_rows) < 0.5, "Quotate", "Non-Quotate"), dtype="str"),
+        "Year": rng.integers(2021, 2025, n_rows),
+        "Total_Missing_KPIs": missing,
+        "Total_OSS_Score": scores,
+        "Transparency_Percentage": (missing / 50 * 100).round(2),
+        "Present_Percentage": (100 - missing / 50 * 100).round(2),
+        "Severity": pd.Series(np.asarray(SEVERITIES)[rng.integers(0, len(SEVERITIES), n_rows)], dtype="str"),
+    })
+
+
+def selections(df, rng):
+    companies = df["Company"].drop_duplicates().sample(min(50, df["Company"].nunique()), random_state=1).tolist()
+    return {
+        "Year": [2022, 2023],
+        "Type": ["Quotate"],
+        "Sector": [f"Sector {i}" for i in rng.choice(20, 5, replace=False)],
+        "Severity": ["Grave", "Critica", "Moderata"],
+        "Company": companies,
+    }
+
+
+def column_mask(series, values):
+    """Boolean array equal to ``series.isin(values)``.
+
+    Categorical columns are matched on their codes: the wanted categories are
+    looked up once and the mask is a single table lookup over the code array.
+    """
+    values = list(values)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.categories.get_indexer(values)
+        # One extra slot so the NaN code (-1) lands on a False entry.
+        lookup = np.zeros(len(series.cat.categories) + 1, dtype=bool)
+        lookup[codes[codes >= 0]] = True
+        return lookup[series.cat.codes.to_numpy()]
+    return series.isin(values).to_numpy()
+
+
+def filter_isin(df, filters):
+    for column, values in filters.items():
+        df = df[df[column].isin(values)]
+    return df
+
+
+def filter_codes(df, filters):
+    for column, values in filters.items():
+        df = df[column_mask(df[column], values)]
+    return df
+
+
+def best_of(fn, *args, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'memory wide':>12} {'compact':>9} {'ratio':>6} "
+          f"{'filter isin':>12} {'codes':>9} {'speedup':>8} {'groupby':>9} {'codes':>9} {'speedup':>8}")
+    for n_rows in args.rows:
+        wide = synthetic(n_rows)
+        compact = compact_companies(wide).astype({"Severity": pd.CategoricalDtype(SEVERITIES)})
+        filters = selections(wide, np.random.default_rng(0))
+        # Without the Company selection the chain keeps enough rows to time the later steps.
+        broad = {k: v for k, v in filters.items() if k != "Company"}
+        pd.testing.assert_frame_equal(
+            filter_codes(compact, filters).astype(wide.dtypes.to_dict()), filter_isin(wide, filters),
+            check_dtype=False, rtol=1e-6,
+        )
+
+        mem_wide = wide.memory_usage(deep=True).sum()
+        mem_compact = compact.memory_usage(deep=True).sum()
+        t_isin = best_of(filter_isin, wide, broad) + best_of(filter_isin, wide, filters)
+        t_codes = best_of(filter_codes, compact, broad) + best_of(filter_codes, compact, filters)
+        t_group = best_of(lambda: wide.groupby("Sector")["Total_OSS_Score"].median())
+        t_group_codes = best_of(lambda: compact.groupby("Sector", observed=True)["Total_OSS_Score"].median())
+        print(f"{n_rows:>9} {mem_wide / 2**20:>10.1f}Mi {mem_compact / 2**20:>7.1f}Mi {mem_wide / mem_compact:>5.1f}x "
+              f"{t_isin * 1000:>10.2f}ms {t_codes * 1000:>7.2f}ms {t_isin / t_codes:>7.1f}x "
+              f"{t_group * 1000:>7.2f}ms {t_group_codes * 1000:>7.2f}ms {t_group / t_group_codes:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
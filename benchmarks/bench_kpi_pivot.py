@@ -0,0 +1,94 @@
+"""Benchmark the wide KPI table build (``kpi_df``) against the old per-cell pivot loop.
+
+Usage: python benchmarks/bench_kpi_pivot.py [--sizes 1000x50 10000x200] [--legacy-max-cells N]
+
+Each size is ``company-years x KPIs``; company-years are spread over four
+years, so every company name appears four times as in the real workbooks.
+The legacy loop is only timed up to ``--legacy-max-cells`` company-year x KPI
+cells (it needs ~30us per cell); where both run, their output is compared.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_loader import build_kpi_table  # noqa: E402
+
+YEARS = 4
+
+
+def synthetic(n_rows, n_kpis, seed=0):
+    rng = np.random.default_rng(seed)
+    kpi_defs = pd.DataFrame({
+        "Category": [f"Category {k % 8}" for k in range(n_kpis)],
+        "KPI": [f"KPI {k}" for k in range(n_kpis)],
+        "Weight": rng.integers(1, 6, n_kpis).astype(float),
+        "ID": [f"k{k}" for k in range(n_kpis)],
+    })
+    names = [f"Company {i // YEARS}" for i in range(n_rows)]
+    missing = (rng.random((n_rows, n_kpis)) < 0.4).astype(np.uint8)
+    oss = missing * kpi_defs["Weight"].to_numpy()
+    return kpi_defs, names, missing, oss
+
+
+def legacy_pivot(kpi_defs, names, missing, oss):
+    """The loop ``load_data`` used before: one dict entry per KPI x company-year.
+
+    Timing includes building the per-record ``kpi_data`` dicts, which the loader
+    also did only to feed this loop.
+    """
+    df_companies = pd.DataFrame({
+        "Company": names,
+        "kpi_data": [
+            {kpi_id: {"value": int(v), "oss": float(o)} for kpi_id, v, o in zip(kpi_defs["ID"], missing[i], oss[i])}
+            for i in range(len(names))
+        ],
+    })
+    full_kpi_rows = []
+    for _, def_row in kpi_defs.iterrows():
+        row_item = {"Category": def_row["Category"], "KPI": def_row["KPI"], "Weight": def_row["Weight"], "ID": def_row["ID"]}
+        kpi_id = def_row["ID"]
+        for _, comp_row in df_companies.iterrows():
+            comp_data = comp_row["kpi_data"].get(kpi_id, {"value": 0, "oss": 0})
+            row_item[f"{comp_row['Company']}_value"] = comp_data["value"]
+            row_item[f"{comp_row['Company']}_oss"] = comp_data["oss"]
+        full_kpi_rows.append(row_item)
+    return pd.DataFrame(full_kpi_rows)
+
+
+def timed(fn, *args, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["500x50", "2000x50", "2000x200", "10000x200"])
+    parser.add_argument("--legacy-max-cells", type=int, default=200_000)
+    args = parser.parse_args()
+
+    print(f"{'company-years x KPIs':>22} {'columns':>8} {'vectorized':>11} {'legacy':>10} {'speedup':>8}")
+    for size in args.sizes:
+        n_rows, n_kpis = (int(x) for x in size.lower().split("x"))
+        data = synthetic(n_rows, n_kpis)
+        t_new, table = timed(build_kpi_table, *data, repeat=3)
+        if n_rows * n_kpis <= args.legacy_max_cells:
+            t_old, expected = timed(legacy_pivot, *data)
+            pd.testing.assert_frame_equal(table, expected)
+            legacy, speedup = f"{t_old:.3f}s", f"{t_old / t_new:.0f}x"
+        else:
+            legacy, speedup = "skipped", "-"
+        print(f"{size:>22} {table.shape[1]:>8} {t_new:>10.4f}s {legacy:>10} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    main()
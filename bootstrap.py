@@ -0,0 +1,227 @@
+import hashlib
+import itertools
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from caching import LRUCache
+from data_loader import in_worker_process, worker_pool
+
+# Resamples per bootstrap and the seed of its Generator (fixed, so renders are reproducible).
+DEFAULT_ITERATIONS = int(os.environ.get("BLINDSPOT_BOOTSTRAP_ITERATIONS", "3000"))
+DEFAULT_SEED = int(os.environ.get("BLINDSPOT_BOOTSTRAP_SEED", "0"))
+# Groups whose a-vs-b split has at most this many arrangements get an exact permutation p-value.
+EXACT_PERMUTATION_LIMIT = int(os.environ.get("BLINDSPOT_EXACT_PERMUTATIONS", "20000"))
+# Upper bound on resample-index elements drawn at once (iterations x group size).
+CHUNK_ELEMENTS = 1 << 22
+# Pairwise runs resample groups on this many processes (0 = one per CPU, 1 = serial) ...
+DEFAULT_WORKERS = int(os.environ.get("BLINDSPOT_STATS_WORKERS", "0"))
+# ... but only when they draw at least this many indices in total (iterations x all group sizes).
+PARALLEL_MIN_ELEMENTS = int(os.environ.get("BLINDSPOT_STATS_PARALLEL_MIN", str(50_000_000)))
+# Multiple-testing correction for pairwise p-values: "bh" (Benjamini-Hochberg) or "holm".
+DEFAULT_CORRECTION = os.environ.get("BLINDSPOT_PAIRWISE_CORRECTION", "bh")
+
+# Results keyed by a hash of the input arrays and the resampling parameters; see /cache-stats.
+result_cache = LRUCache(maxsize=512, name="bootstrap")
+
+
+# ---------------------
+# Resampling
+# ---------------------
+def array_key(*arrays):
+    """Hex digest identifying the contents of ``arrays`` (as float64)."""
+    digest = hashlib.sha1()
+    for array in arrays:
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+def resample_means(values, iterations, rng):
+    """Means of ``iterations`` bootstrap resamples of ``values``.
+
+    Resample indices are drawn as an (iterations x n) matrix from ``rng`` and
+    reduced row-wise, in chunks of at most ``CHUNK_ELEMENTS`` indices.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    means = np.empty(iterations)
+    step = max(1, CHUNK_ELEMENTS // max(n, 1))
+    for start in range(0, iterations, step):
+        stop = min(start + step, iterations)
+        means[start:stop] = values[rng.integers(0, n, size=(stop - start, n))].mean(axis=1)
+    return means
+
+
+def summarize(diffs):
+    """Mean, 95% percentile CI and two-sided p-value of bootstrap differences (along axis 0)."""
+    ci_low, ci_high = np.percentile(diffs, [2.5, 97.5], axis=0)
+    p_two = 2 * np.minimum((diffs >= 0).mean(axis=0), (diffs <= 0).mean(axis=0))
+    return {"diff_mean": diffs.mean(axis=0), "ci_low": ci_low, "ci_high": ci_high, "p_value": p_two}
+
+
+def permutation_pvalue(a, b):
+    """Exact two-sided permutation p-value for ``mean(a) - mean(b)``.
+
+    Enumerates every way of splitting the pooled values into groups of the
+    original sizes, so it is only meant for small groups.
+    """
+    pooled = np.concatenate([a, b])
+    splits = np.array(list(itertools.combinations(range(len(pooled)), len(a))))
+    sum_a = pooled[splits].sum(axis=1)
+    diffs = sum_a / len(a) - (pooled.sum() - sum_a) / len(b)
+    observed = abs(a.mean() - b.mean())
+    # Tolerance so splits equal to the observed difference are not lost to rounding.
+    return float((np.abs(diffs) >= observed - 1e-12 * max(1.0, observed)).mean())
+
+
+def bootstrap_diff(a, b, iterations=DEFAULT_ITERATIONS, seed=DEFAULT_SEED, permutation="auto"):
+    """Bootstrap ``mean(a) - mean(b)``: mean, 95% CI and two-sided p-value, or None if a group is empty.
+
+    ``permutation`` picks the p-value: ``"auto"`` uses an exact permutation
+    test when the groups have at most ``EXACT_PERMUTATION_LIMIT`` splits,
+    True forces it and False always uses the bootstrap. ``p_method`` in the
+    result says which one was used.
+    """
+    if len(a) == 0 or len(b) == 0:
+        return None
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    exact = permutation is True or (
+        permutation == "auto" and math.comb(len(a) + len(b), len(a)) <= EXACT_PERMUTATION_LIMIT
+    )
+    key = ("diff", array_key(a, b), iterations, seed, exact)
+
+    def compute():
+        rng = np.random.default_rng(seed)
+        diffs = resample_means(a, iterations, rng) - resample_means(b, iterations, rng)
+        result = {k: float(v) for k, v in summarize(diffs).items()}
+        if exact:
+            result["p_value"] = permutation_pvalue(a, b)
+        result["p_method"] = "permutation" if exact else "bootstrap"
+        return result
+
+    return dict(result_cache.get_or_compute(key, compute))
+
+
+def resample_column_means(matrix, iterations, rng):
+    """Column means of ``iterations`` bootstrap resamples of the rows of ``matrix``: (iterations x columns).
+
+    Each resample is turned into a row-multiplicity vector (a bincount of
+    its indices), so a chunk of resamples is a single (chunk x rows) @
+    (rows x columns) product; rows are resampled together, keeping columns
+    paired.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n = matrix.shape[0]
+    means = np.empty((iterations, matrix.shape[1]))
+    step = max(1, CHUNK_ELEMENTS // max(n, 1))
+    for start in range(0, iterations, step):
+        stop = min(start + step, iterations)
+        size = stop - start
+        # Offset each resample's indices into its own block of n bins.
+        index = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+        counts = np.bincount(index.ravel(), minlength=size * n).reshape(size, n)
+        means[start:stop] = counts @ matrix / n
+    return means
+
+
+def bootstrap_column_diffs(a, b, iterations=DEFAULT_ITERATIONS, seed=DEFAULT_SEED):
+    """Bootstrap ``a.mean(0) - b.mean(0)`` for every column of two (rows x columns) matrices at once.
+
+    Returns a DataFrame with one row per column: ``diff`` (observed), the
+    bootstrap ``diff_mean``, 95% ``ci_low``/``ci_high`` and ``p_value``; None
+    if either matrix has no rows.
+    """
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if len(a) == 0 or len(b) == 0:
+        return None
+    key = ("columns", array_key(a, b), iterations, seed)
+
+    def compute():
+        rng = np.random.default_rng(seed)
+        diffs = resample_column_means(a, iterations, rng) - resample_column_means(b, iterations, rng)
+        result = pd.DataFrame(summarize(diffs))
+        result.insert(0, "diff", a.mean(axis=0) - b.mean(axis=0))
+        return result
+
+    return result_cache.get_or_compute(key, compute).copy()
+
+
+# ---------------------
+# Pairwise comparisons
+# ---------------------
+def adjust_pvalues(p_values, method=DEFAULT_CORRECTION):
+    """Multiple-testing adjusted p-values: Benjamini-Hochberg FDR (``"bh"``) or Holm step-down (``"holm"``)."""
+    p = np.asarray(p_values, dtype=np.float64)
+    m = len(p)
+    if m == 0:
+        return p.copy()
+    order = np.argsort(p, kind="stable")
+    ranked = p[order]
+    if method == "bh":
+        adjusted = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    elif method == "holm":
+        adjusted = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    else:
+        raise ValueError(f"Unknown correction {method!r}; expected 'bh' or 'holm'")
+    out = np.empty(m)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def _group_means(values, iterations, seed_seq):
+    return resample_means(values, iterations, np.random.default_rng(seed_seq))
+
+
+def pairwise_bootstrap(groups, iterations=DEFAULT_ITERATIONS, seed=DEFAULT_SEED, correction=DEFAULT_CORRECTION,
+                       workers=DEFAULT_WORKERS, alpha=0.05):
+    """Bootstrap ``mean(a) - mean(b)`` for every pair of ``groups`` (``{label: values}``) in one run.
+
+    Each group is resampled once, with its own child of ``SeedSequence(seed)``,
+    so results do not depend on how the work is split. The pairwise
+    differences are then columns of one (iterations x pairs) matrix, reduced
+    together. Large grids resample their groups on a process pool. Returns one
+    row per pair (``A`` before ``B`` in ``groups`` order) with the bootstrap
+    summary, ``p_adjusted`` under ``correction`` and ``significant`` at ``alpha``.
+    """
+    columns = ["A", "B", "n_a", "n_b", "diff_mean", "ci_low", "ci_high", "p_value", "p_adjusted", "significant"]
+    labels, arrays = [], []
+    for label, values in groups.items():
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            labels.append(label)
+            arrays.append(values)
+    if len(labels) < 2:
+        return pd.DataFrame(columns=columns)
+    key = ("pairwise", tuple(map(str, labels)), array_key(*arrays), iterations, seed, correction, alpha)
+
+    def compute():
+        seeds = np.random.SeedSequence(seed).spawn(len(arrays))
+        n_workers = min(workers or os.cpu_count() or 1, len(arrays))
+        # Never nest pools: a worker re-importing the app must not start its own.
+        if n_workers > 1 and not in_worker_process() and iterations * sum(map(len, arrays)) >= PARALLEL_MIN_ELEMENTS:
+            with worker_pool(n_workers) as pool:
+                means = list(pool.map(_group_means, arrays, [iterations] * len(arrays), seeds))
+        else:
+            means = [_group_means(values, iterations, seq) for values, seq in zip(arrays, seeds)]
+        means = np.column_stack(means)
+
+        first, second = np.triu_indices(len(labels), k=1)
+        summary = summarize(means[:, first] - means[:, second])
+        pairs = pd.DataFrame({
+            "A": [labels[i] for i in first],
+            "B": [labels[j] for j in second],
+            "n_a": [len(arrays[i]) for i in first],
+            "n_b": [len(arrays[j]) for j in second],
+            **summary,
+        })
+        pairs["p_adjusted"] = adjust_pvalues(pairs["p_value"].to_numpy(), correction)
+        pairs["significant"] = pairs["p_adjusted"] < alpha
+        return pairs[columns]
+
+    return result_cache.get_or_compute(key, compute).copy()
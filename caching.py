@@ -0,0 +1,216 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------
+# LRU cache
+# ---------------------
+class LRUCache:
+    """Thread-safe least-recently-used cache holding at most ``maxsize`` entries.
+
+    With ``maxbytes`` the total ``sizeof(value)`` is bounded too, and values
+    larger than the whole budget are not stored. ``hits``, ``misses`` and
+    ``evictions`` count lookups since creation (or the last ``clear``) so the
+    size can be tuned from ``stats()``.
+    """
+
+    def __init__(self, maxsize=128, name="cache", maxbytes=None, sizeof=len):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.name = name
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.maxbytes is not None else 0
+        with self._lock:
+            if self.maxbytes is not None and size > self.maxbytes:
+                return
+            if key in self._entries:
+                self.nbytes -= self._sizes.pop(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self.nbytes += size
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.nbytes > self.maxbytes):
+                evicted, _ = self._entries.popitem(last=False)
+                self.nbytes -= self._sizes.pop(evicted)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Cached value for ``key``; on a miss ``compute()`` runs outside the lock and its result is stored."""
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# ---------------------
+# Disk tier
+# ---------------------
+class DiskCache:
+    """Text values stored as one file per key under ``directory``, shared by every process using it.
+
+    Writes go to a temporary file and are renamed into place, so readers never
+    see partial entries. Reads touch the file's mtime; when the directory grows
+    past ``maxbytes`` the least recently used files are deleted.
+
+    Each write updates a running byte total instead of listing the directory;
+    the directory is only scanned when that total passes ``maxbytes``, and
+    every ``RESCAN_EVERY`` writes to pick up entries other processes added.
+    A scan that has to evict goes down to ``PRUNE_TO`` of the budget, so the
+    writes right after it do not scan again.
+    """
+
+    RESCAN_EVERY = 64
+    PRUNE_TO = 0.9
+
+    def __init__(self, directory, maxbytes=512 * 2**20, name="disk"):
+        self.directory = directory
+        self.maxbytes = maxbytes
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # Bytes under ``directory`` as of the last scan plus this process's writes since (None = not scanned yet).
+        self._nbytes = None
+        self._writes = 0
+
+    def _path(self, key):
+        digest = hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(value)
+            size = os.path.getsize(tmp_path)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Could not write cache entry %s: %s", path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._writes += 1
+            if self._nbytes is not None:
+                self._nbytes += size - replaced
+            scan = self._nbytes is None or self._nbytes > self.maxbytes or self._writes % self.RESCAN_EVERY == 0
+        if scan:
+            self._prune()
+
+    def _prune(self):
+        try:
+            entries = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")]
+            stats = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in entries]
+        except OSError:
+            return
+        total = sum(size for _, size, _ in stats)
+        target = self.maxbytes * self.PRUNE_TO if total > self.maxbytes else self.maxbytes
+        for _, size, path in sorted(stats):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        with self._lock:
+            self._nbytes = total
+
+    def stats(self):
+        return {"name": self.name, "directory": self.directory, "maxbytes": self.maxbytes, "nbytes": self._nbytes,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class TieredCache:
+    """Memory ``LRUCache`` in front of an optional ``DiskCache``; disk hits are promoted to memory."""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key)
+        if value is None and self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return default if value is None else value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def stats(self):
+        return [self.memory.stats()] + ([self.disk.stats()] if self.disk is not None else [])
+
+
+def normalize_selection(values):
+    """Sorted, de-duplicated tuple for one multi-select filter (None and [] both become ())."""
+    return tuple(sorted(set(values or ()), key=lambda v: (str(type(v)), v)))
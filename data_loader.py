@@ -0,0 +1,838 @@
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from itertools import repeat
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from dataset import Dataset, MissingnessMatrix, compact_companies
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datasets")
+
+# Sheet layout: row 0 holds the year (col B) and the sector band, row 1 the
+# headers, KPI rows start at row 2 and end at the "Totale" row. Columns A-C are
+# Category / KPI / Weight, company columns start at D, each followed by its OSS.
+SECTOR_ROW = 0
+HEADER_ROW = 1
+FIRST_KPI_ROW = 2
+FIRST_COMPANY_COL = 3
+
+
+# ---------------------
+# Instrumentation
+# ---------------------
+class _StageRecord:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.cols = 0
+        self.peak_bytes = 0
+
+    def scanned(self, rows, cols):
+        self.rows += int(rows)
+        self.cols = max(self.cols, int(cols))
+
+
+class _NullStage:
+    def scanned(self, rows, cols):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class LoadProfile:
+    """Per-stage wall time, rows/columns scanned and peak memory of one ``load_dataset`` call.
+
+    Stages accumulate over calls (one "sheet_read" per sheet, and so on); ``rows``
+    is summed, ``cols`` is the widest scan. Peak memory is the highest
+    tracemalloc peak above the allocation level at stage entry, so it is only
+    filled in with ``trace_memory=True`` (tracing slows the load down).
+    Workbooks parsed in worker processes only show up in "parse_pool".
+    """
+
+    STAGES = ("discovery", "cache_read", "workbook_open", "sheet_read", "company_scan",
+              "parse_pool", "company_records", "kpi_definitions", "pivot", "assembly")
+
+    def __init__(self, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self.total_seconds = 0.0
+        self.peak_bytes = 0
+        self._open_peaks = []
+
+    def _fold_peak(self):
+        # reset_peak() is global, so fold the peak seen so far into the
+        # enclosing stages before a nested stage resets it.
+        peak = tracemalloc.get_traced_memory()[1]
+        self.peak_bytes = max(self.peak_bytes, peak)
+        if self._open_peaks:
+            self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+        return peak
+
+    @contextmanager
+    def stage(self, name):
+        record = self.stages.setdefault(name, _StageRecord())
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            self._fold_peak()
+            start_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            self._open_peaks.append(0)
+        t0 = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.calls += 1
+            record.seconds += time.perf_counter() - t0
+            if tracing:
+                peak = max(tracemalloc.get_traced_memory()[1], self._open_peaks.pop())
+                record.peak_bytes = max(record.peak_bytes, peak - start_bytes)
+                self._fold_peak()
+                if self._open_peaks:
+                    self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+
+    @contextmanager
+    def run(self):
+        """Make this the active profile for the loader functions called inside the block."""
+        global _active_profile
+        started = self.trace_memory and not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        previous, _active_profile = _active_profile, self
+        t0 = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.total_seconds += time.perf_counter() - t0
+            _active_profile = previous
+            if started:
+                self._fold_peak()
+                tracemalloc.stop()
+
+    def report(self):
+        order = {name: i for i, name in enumerate(self.STAGES)}
+        stages = sorted(self.stages.items(), key=lambda item: order.get(item[0], len(order)))
+        return {
+            "total_seconds": round(self.total_seconds, 6),
+            "peak_bytes": self.peak_bytes if self.trace_memory else None,
+            "stages": [
+                {
+                    "stage": name,
+                    "calls": record.calls,
+                    "seconds": round(record.seconds, 6),
+                    "rows": record.rows,
+                    "cols": record.cols,
+                    "peak_bytes": record.peak_bytes if self.trace_memory else None,
+                }
+                for name, record in stages
+            ],
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.report(), indent=indent)
+
+    def log_line(self):
+        parts = []
+        for stage in self.report()["stages"]:
+            part = f"{stage['stage']} {stage['seconds']:.3f}s x{stage['calls']} ({stage['rows']}r x {stage['cols']}c"
+            if stage["peak_bytes"] is not None:
+                part += f", peak {stage['peak_bytes'] / 2**20:.1f}MiB"
+            parts.append(part + ")")
+        return f"load profile: total {self.total_seconds:.3f}s | " + " | ".join(parts)
+
+
+_active_profile = None
+
+
+def _stage(name):
+    """Time ``name`` on the active ``LoadProfile``; a no-op when nothing is being profiled."""
+    if _active_profile is None:
+        return nullcontext(_NULL_STAGE)
+    return _active_profile.stage(name)
+
+
+# ---------------------
+# File discovery
+# ---------------------
+def discover_files(file_patterns=None):
+    """Return the workbook paths matched by ``file_patterns`` (deduplicated, in order)."""
+    files = []
+    if file_patterns is None:
+        if os.path.isdir(BASE_DIR):
+            file_patterns = [
+                os.path.join(BASE_DIR, "quotate", "*.xlsx"),
+                os.path.join(BASE_DIR, "non_quotate", "*.xlsx"),
+            ]
+        else:
+            file_patterns = ["QUOTATE*.xlsx", "*NON-QUOTATE*.xlsx"]
+
+    with _stage("discovery") as stage:
+        for pattern in file_patterns:
+            files.extend(sorted(glob.glob(pattern)))
+        stage.scanned(len(files), len(file_patterns))
+    if not files:
+        fallback_files = [
+            os.path.join(BASE_DIR, "quotate", "QUOTATE-KPI-OSS.xlsx"),
+            os.path.join(BASE_DIR, "non_quotate", "NON-QUOTATE-KPI-OSS.xlsx"),
+            "QUOTATE-KPI-OSS.xlsx",
+            "NON-QUOTATE-KPI-OSS.xlsx",
+        ]
+        files = [f for f in fallback_files if os.path.exists(f)]
+    return list(dict.fromkeys(files))  # dedupe while preserving order
+
+
+def source_type_for(file_path):
+    return "Quotate" if "NON" not in file_path.upper() else "Non-Quotate"
+
+
+# ---------------------
+# Cell helpers (work on object arrays of any shape)
+# ---------------------
+def _as_text(values):
+    return np.char.strip(np.asarray(values, dtype=object).astype(str))
+
+
+def _blank_mask(values):
+    values = np.asarray(values, dtype=object)
+    return pd.isna(values) | (_as_text(values) == "")
+
+
+def _missing_flags(values):
+    # A KPI counts as missing only when the cell reads exactly "1".
+    values = np.asarray(values, dtype=object)
+    return (~pd.isna(values) & (_as_text(values) == "1")).astype(np.uint8)
+
+
+def _numeric(values):
+    values = np.asarray(values, dtype=object)
+    flat = pd.to_numeric(pd.Series(values.ravel(), dtype=object), errors="coerce")
+    return flat.fillna(0).to_numpy(dtype=float).reshape(values.shape)
+
+
+def _forward_fill(labels, blank, default="Unknown"):
+    filled = pd.Series(np.where(blank, None, labels), dtype=object).ffill()
+    return filled.fillna(default).to_numpy(dtype=object)
+
+
+def _parse_year(cell):
+    try:
+        return int(cell) if pd.notna(cell) else None
+    except (TypeError, ValueError):
+        return None
+
+
+# ---------------------
+# Sheet parser
+# ---------------------
+def _is_total(values):
+    values = np.asarray(values, dtype=object)
+    return ~pd.isna(values) & (np.char.lower(_as_text(values)) == "totale")
+
+
+def _kpi_block_rows(raw):
+    """Row indices of the KPI block: from FIRST_KPI_ROW up to "Totale", skipping rows without a KPI name."""
+    is_total = _is_total(raw[FIRST_KPI_ROW:, 0])
+    stop = FIRST_KPI_ROW + int(np.argmax(is_total)) if is_total.any() else raw.shape[0]
+    rows = np.arange(FIRST_KPI_ROW, stop)
+    return rows[~_blank_mask(raw[rows, 1])]
+
+
+def _company_columns(sector_row, header_row):
+    """Locate company columns in the header row; each one is followed by its OSS column."""
+    sector_cells = sector_row[FIRST_COMPANY_COL:]
+    sectors = _forward_fill(_as_text(sector_cells), _blank_mask(sector_cells))
+    headers = _as_text(header_row[FIRST_COMPANY_COL:])
+
+    names, sector_of, value_cols = [], [], []
+    col_idx = FIRST_COMPANY_COL
+    while col_idx < len(header_row):
+        col_name = headers[col_idx - FIRST_COMPANY_COL]
+        if col_name and col_name.upper() != "OSS" and col_name.lower() != "nan":
+            names.append(col_name)
+            sector_of.append(sectors[col_idx - FIRST_COMPANY_COL])
+            value_cols.append(col_idx)
+            col_idx += 2
+        else:
+            col_idx += 1
+    return names, sector_of, np.asarray(value_cols, dtype=int)
+
+
+@dataclass
+class ParsedSheet:
+    """Array form of one parsed sheet: KPI rows x company columns."""
+    year: object
+    kpi_ids: list
+    categories: list
+    kpi_names: list
+    weights: np.ndarray
+    companies: list
+    sectors: list
+    missing: np.ndarray
+    oss: np.ndarray
+
+
+def _build_sheet(year, cat_cells, name_cells, weight_cells, names, sectors, missing, oss):
+    categories = _forward_fill(_as_text(cat_cells), _blank_mask(cat_cells))
+    return ParsedSheet(
+        year=year,
+        kpi_ids=[f"{cat}|{name}" for cat, name in zip(categories, name_cells)],
+        categories=[str(cat) for cat in categories],
+        kpi_names=[str(name).strip() for name in name_cells],
+        weights=_numeric(weight_cells),
+        companies=names,
+        sectors=[str(sec) for sec in sectors],
+        missing=missing,
+        oss=oss,
+    )
+
+
+def parse_sheet(df_raw):
+    """Parse one KPI sheet into a ``ParsedSheet``.
+
+    The KPI block (rows 2.."Totale", columns 3+) is sliced out of the sheet once
+    as a NumPy array. Category fill and KPI IDs are built once per sheet, and
+    missing flags / OSS scores for every company column come from array
+    operations on that block.
+    """
+    raw = df_raw.to_numpy(dtype=object)
+    if raw.ndim != 2 or raw.shape[0] <= HEADER_ROW or raw.shape[1] <= 1:
+        return None
+    with _stage("company_scan") as stage:
+        rows = _kpi_block_rows(raw)
+        names, sectors, value_cols = _company_columns(raw[SECTOR_ROW], raw[HEADER_ROW])
+        block = raw[rows]
+        missing = _missing_flags(block[:, value_cols])
+        # The last company may have no OSS column to its right; treat it as 0.
+        oss_cols = value_cols + 1
+        has_oss = oss_cols < raw.shape[1]
+        oss = np.zeros(missing.shape, dtype=float)
+        oss[:, has_oss] = _numeric(block[:, oss_cols[has_oss]])
+        stage.scanned(len(block), 2 * len(value_cols))
+    return _build_sheet(
+        _parse_year(raw[SECTOR_ROW, 1]), block[:, 0], block[:, 1], block[:, 2],
+        names, sectors, missing, oss,
+    )
+
+
+def company_records(sheet, source_type):
+    totals_missing = sheet.missing.sum(axis=0)
+    totals_oss = sheet.oss.sum(axis=0)
+    records = []
+    for j, company_name in enumerate(sheet.companies):
+        records.append({
+            "Company": company_name,
+            "Sector": sheet.sectors[j],
+            "Type": source_type,
+            "Year": sheet.year,
+            "Total_Missing_KPIs": int(totals_missing[j]),
+            "Total_OSS_Score": float(totals_oss[j]),
+        })
+    return records
+
+
+def kpi_definitions(sheet):
+    return [
+        {"Category": cat, "KPI": name, "Weight": float(weight), "ID": kpi_id}
+        for cat, name, weight, kpi_id in zip(sheet.categories, sheet.kpi_names, sheet.weights, sheet.kpi_ids)
+    ]
+
+
+def parse_workbook(file_path):
+    """Parse every sheet of a workbook, opening the archive exactly once."""
+    t0 = time.perf_counter()
+    with _stage("workbook_open"):
+        xls = pd.ExcelFile(file_path)
+    t_open = time.perf_counter() - t0
+    with xls, _stage("sheet_read") as stage:
+        frames = xls.parse(sheet_name=None, header=None)
+        for frame in frames.values():
+            stage.scanned(*frame.shape)
+    t_read = time.perf_counter() - t0 - t_open
+    sheets = []
+    for df_raw in frames.values():
+        sheet = parse_sheet(df_raw)
+        if sheet is not None:
+            sheets.append(sheet)
+    logger.info(
+        "Read %s: %d sheet(s), opened once instead of %d times; open %.3fs + read %.3fs + parse %.3fs",
+        os.path.basename(file_path), len(frames), len(frames) + 1, t_open, t_read,
+        time.perf_counter() - t0 - t_open - t_read,
+    )
+    return sheets
+
+
+# ---------------------
+# Streaming backend
+# ---------------------
+# Strings pandas reads as NaN by default; the streaming backend applies the
+# same rule so both backends see identical cell values.
+_NA_STRINGS = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+])
+
+
+def _convert_cell(cell):
+    # Mirrors pandas' openpyxl reader: integral floats become ints, error
+    # cells and NA markers become NaN.
+    value = cell.value
+    if value is None or cell.data_type == "e":
+        return np.nan
+    if cell.data_type == "n":
+        as_int = int(value)
+        return as_int if as_int == value else float(value)
+    if isinstance(value, str) and value in _NA_STRINGS:
+        return np.nan
+    return value
+
+
+def iter_sheet_rows(worksheet):
+    """Yield the rows of a read-only worksheet one at a time as lists of converted cells."""
+    worksheet.reset_dimensions()
+    for row in worksheet.rows:
+        yield [_convert_cell(cell) for cell in row]
+
+
+def _padded(row, width):
+    return np.asarray(row + [np.nan] * (width - len(row)), dtype=object)
+
+
+def stream_sheet(rows):
+    """Build a ``ParsedSheet`` from an iterator of rows without materializing the sheet.
+
+    Only the current row is held as cells; per KPI row we keep the Category /
+    KPI / Weight cells and the company missing/OSS vectors.
+    """
+    rows = iter(rows)
+    sector_row = next(rows, None)
+    header_row = next(rows, None)
+    if header_row is None:
+        return None
+    width = max(len(sector_row), len(header_row))
+    sector_row, header_row = _padded(sector_row, width), _padded(header_row, width)
+    names, sectors, value_cols = _company_columns(sector_row, header_row)
+    oss_cols = value_cols + 1
+    row_width = oss_cols.max() + 1 if len(oss_cols) else 3
+
+    kpi_cells, missing_rows, oss_rows = [], [], []
+    for row in rows:
+        width = max(width, len(row))
+        row = _padded(row[:row_width], max(row_width, 3))
+        if _is_total(row[:1])[0]:
+            break
+        if _blank_mask(row[1:2])[0]:
+            continue
+        kpi_cells.append(row[:3])
+        missing_rows.append(_missing_flags(row[value_cols]))
+        oss_rows.append(_numeric(row[oss_cols]))
+    if width <= 1:
+        return None
+
+    kpi_cells = np.array(kpi_cells, dtype=object).reshape(-1, 3)
+    shape = (len(kpi_cells), len(names))
+    missing = np.array(missing_rows, dtype=np.uint8).reshape(shape)
+    oss = np.array(oss_rows, dtype=float).reshape(shape)
+    return _build_sheet(
+        _parse_year(sector_row[1]), kpi_cells[:, 0], kpi_cells[:, 1], kpi_cells[:, 2],
+        names, sectors, missing, oss,
+    )
+
+
+def iter_workbook_sheets(file_path):
+    """Stream a workbook through openpyxl's read-only iterator, yielding one ``ParsedSheet`` per sheet."""
+    with _stage("workbook_open"):
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        for worksheet in workbook.worksheets:
+            # Streaming reads and scans in the same pass, so both count as "sheet_read".
+            with _stage("sheet_read") as stage:
+                sheet = stream_sheet(iter_sheet_rows(worksheet))
+                if sheet is not None:
+                    stage.scanned(len(sheet.kpi_ids), 2 * len(sheet.companies))
+            if sheet is not None:
+                yield sheet
+    finally:
+        workbook.close()
+
+
+def stream_workbook(file_path):
+    t0 = time.perf_counter()
+    sheets = list(iter_workbook_sheets(file_path))
+    logger.info("Streamed %s: %d sheet(s) in %.3fs", os.path.basename(file_path), len(sheets), time.perf_counter() - t0)
+    return sheets
+
+
+# Parsing backends selectable through load_data(backend=...) or BLINDSPOT_LOADER_BACKEND.
+BACKENDS = {"pandas": parse_workbook, "stream": stream_workbook}
+DEFAULT_BACKEND = os.environ.get("BLINDSPOT_LOADER_BACKEND", "pandas")
+
+
+# ---------------------
+# Parsed-workbook cache
+# ---------------------
+# Bump when the parser output changes so stale cache entries are ignored.
+CACHE_FORMAT = 1
+DEFAULT_CACHE_DIR = os.environ.get(
+    "BLINDSPOT_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "datasets"),
+)
+_SHEET_TEXT_FIELDS = ("kpi_ids", "categories", "kpi_names", "companies", "sectors")
+_SHEET_ARRAY_FIELDS = ("weights", "missing", "oss")
+
+
+def _content_hash(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def workbook_fingerprint(file_path, with_hash=True):
+    stat = os.stat(file_path)
+    return {
+        "path": os.path.abspath(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _content_hash(file_path) if with_hash else None,
+    }
+
+
+def _cache_file(cache_dir, file_path):
+    key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, f"{key}.npz")
+
+
+def read_cached_workbook(cache_dir, file_path):
+    """Return the cached sheets for ``file_path`` or None when the entry is missing or stale.
+
+    Size and mtime are checked first; if they moved but the content hash still
+    matches (file copied or touched), the entry is reused and its stamp refreshed.
+    """
+    cache_file = _cache_file(cache_dir, file_path)
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        with np.load(cache_file, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            fingerprint = workbook_fingerprint(file_path, with_hash=False)
+            if meta["format"] != CACHE_FORMAT or meta["path"] != fingerprint["path"]:
+                return None
+            if (meta["size"], meta["mtime_ns"]) != (fingerprint["size"], fingerprint["mtime_ns"]):
+                fingerprint["sha256"] = _content_hash(file_path)
+                if meta["sha256"] != fingerprint["sha256"]:
+                    return None
+                refresh = True
+            else:
+                refresh = False
+            sheets = []
+            for i, year in enumerate(meta["years"]):
+                fields = {name: data[f"s{i}_{name}"].tolist() for name in _SHEET_TEXT_FIELDS}
+                fields.update({name: data[f"s{i}_{name}"] for name in _SHEET_ARRAY_FIELDS})
+                sheets.append(ParsedSheet(year=year, **fields))
+    except Exception as e:
+        logger.warning("Ignoring unreadable cache entry %s: %s", cache_file, e)
+        return None
+    if refresh:
+        write_cached_workbook(cache_dir, file_path, sheets, fingerprint)
+    return sheets
+
+
+def write_cached_workbook(cache_dir, file_path, sheets, fingerprint=None):
+    fingerprint = fingerprint or workbook_fingerprint(file_path)
+    meta = dict(fingerprint, format=CACHE_FORMAT, years=[sheet.year for sheet in sheets])
+    arrays = {"meta": np.array(json.dumps(meta))}
+    for i, sheet in enumerate(sheets):
+        for name in _SHEET_TEXT_FIELDS:
+            arrays[f"s{i}_{name}"] = np.array(getattr(sheet, name), dtype=str)
+        for name in _SHEET_ARRAY_FIELDS:
+            arrays[f"s{i}_{name}"] = np.asarray(getattr(sheet, name))
+    cache_file = _cache_file(cache_dir, file_path)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        logger.warning("Could not write cache entry %s: %s", cache_file, e)
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _parse_and_cache(file_path, cache_dir=None, backend=DEFAULT_BACKEND):
+    fingerprint = workbook_fingerprint(file_path) if cache_dir else None
+    sheets = BACKENDS[backend](file_path)
+    if cache_dir:
+        write_cached_workbook(cache_dir, file_path, sheets, fingerprint)
+    return sheets
+
+
+def load_workbook(file_path, cache_dir=None, backend=DEFAULT_BACKEND):
+    """Parsed sheets of one workbook, served from the cache when its fingerprint is unchanged."""
+    if cache_dir:
+        sheets = read_cached_workbook(cache_dir, file_path)
+        if sheets is not None:
+            return sheets
+    return _parse_and_cache(file_path, cache_dir, backend)
+
+
+# ---------------------
+# Parallel ingestion
+# ---------------------
+DEFAULT_WORKERS = int(os.environ.get("BLINDSPOT_LOADER_WORKERS", "1"))
+
+
+def _parse_task(file_path, cache_dir, backend):
+    # Runs in a worker process: errors come back as text so the parent can
+    # report them in file order, exactly like the serial path.
+    try:
+        return _parse_and_cache(file_path, cache_dir, backend), None
+    except Exception as e:
+        return None, str(e)
+
+
+def file_stamp(file_path):
+    """Cheap change marker for a workbook: ``(size, mtime_ns)``."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Pools are started from a threaded server (Flask request threads, the dataset
+# watcher), where forking can deadlock on a lock held by another thread, so
+# workers come from a clean forkserver (spawn where that is unavailable).
+POOL_START_METHOD = os.environ.get(
+    "BLINDSPOT_POOL_START_METHOD",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn",
+)
+_in_worker = False
+
+
+def _mark_worker():
+    global _in_worker
+    _in_worker = True
+
+
+def in_worker_process():
+    """True inside a ``worker_pool`` process, where no pool may be started."""
+    return _in_worker
+
+
+def worker_pool(max_workers):
+    """``ProcessPoolExecutor`` on the ``POOL_START_METHOD`` context whose workers see ``in_worker_process()``."""
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    if POOL_START_METHOD == "forkserver":
+        # The server imports this module (numpy, pandas, openpyxl) once and forks
+        # workers from it, instead of each worker importing them again. (It can
+        # only do so when started from the app directory; otherwise workers
+        # import it themselves.)
+        context.set_forkserver_preload([__name__])
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context, initializer=_mark_worker)
+
+
+def load_workbooks(files, cache_dir=None, workers=DEFAULT_WORKERS, backend=DEFAULT_BACKEND, memo=None):
+    """Return ``(sheets, error)`` per file, in the order of ``files``.
+
+    ``memo`` is an optional ``{path: (stamp, sheets, error)}`` dict kept by the
+    caller between loads: workbooks whose ``file_stamp`` is unchanged are taken
+    from it without touching the disk cache, and it is updated with whatever was
+    read. Failed workbooks are remembered too, so they are only retried once
+    their stamp changes.
+    Cache hits are read in this process; the remaining workbooks are parsed on
+    a ``worker_pool`` with ``workers`` processes (0 = one per CPU, 1 =
+    serial). Results are merged back by file position, so the output does not
+    depend on which worker finishes first.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown loader backend {backend!r}; expected one of {sorted(BACKENDS)}")
+    results = {}
+    pending = []
+    stamps = {file_path: file_stamp(file_path) for file_path in files} if memo is not None else {}
+    for file_path in files:
+        if memo is not None and file_path in memo and memo[file_path][0] == stamps[file_path]:
+            results[file_path] = memo[file_path][1:]
+            continue
+        sheets = None
+        if cache_dir:
+            with _stage("cache_read") as stage:
+                sheets = read_cached_workbook(cache_dir, file_path)
+                if sheets:
+                    stage.scanned(sum(len(sheet.kpi_ids) for sheet in sheets), max(2 * len(sheet.companies) for sheet in sheets))
+        if sheets is not None:
+            results[file_path] = (sheets, None)
+        else:
+            pending.append(file_path)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(pending) > 1 and not in_worker_process():
+        with _stage("parse_pool") as stage, worker_pool(min(workers, len(pending))) as pool:
+            stage.scanned(len(pending), workers)
+            for file_path, result in zip(pending, pool.map(_parse_task, pending, repeat(cache_dir), repeat(backend))):
+                results[file_path] = result
+    else:
+        for file_path in pending:
+            results[file_path] = _parse_task(file_path, cache_dir, backend)
+    if memo is not None:
+        for file_path in list(memo):
+            if file_path not in results:
+                del memo[file_path]
+        for file_path, (sheets, error) in results.items():
+            memo[file_path] = (stamps[file_path], sheets, error)
+    return [results[file_path] for file_path in files]
+
+
+# ---------------------
+# Data loader
+# ---------------------
+def _aligned_sheet_arrays(sheet, kpi_codes, n_unique):
+    """Sheet missing/OSS arrays as (company x KPI), with KPIs in ``kpi_df`` order.
+
+    KPIs the sheet does not have count as present (0), as in ``kpi_df``; when a
+    KPI ID repeats inside a sheet the last row wins.
+    """
+    rows_by_id = {}
+    for r, kpi_id in enumerate(sheet.kpi_ids):
+        rows_by_id[kpi_id] = r
+    missing = np.zeros((n_unique, len(sheet.companies)), dtype=np.uint8)
+    oss = np.zeros((n_unique, len(sheet.companies)), dtype=float)
+    for code, kpi_id in enumerate(kpi_codes.categories):
+        r = rows_by_id.get(kpi_id)
+        if r is not None:
+            missing[code] = sheet.missing[r]
+            oss[code] = sheet.oss[r]
+    return missing[kpi_codes.codes].T, oss[kpi_codes.codes].T
+
+
+def build_kpi_table(kpi_defs, company_names, missing, oss):
+    """Wide KPI table: the KPI definitions plus a ``{Company}_value`` / ``{Company}_oss`` column pair per company.
+
+    ``missing``/``oss`` are (company-year x KPI) arrays with one row per entry of
+    ``company_names`` and KPIs in ``kpi_defs`` order. A company that appears in
+    several years keeps its last row; column pairs follow first appearance.
+    The table is assembled from two array blocks instead of cell by cell.
+    """
+    names = pd.Index(company_names)
+    last = pd.Series(np.arange(len(names))).groupby(names, sort=False).last()
+    values = pd.DataFrame(missing[last.to_numpy()].T.astype(np.int64), columns=[f"{c}_value" for c in last.index])
+    points = pd.DataFrame(oss[last.to_numpy()].T.astype(np.float64), columns=[f"{c}_oss" for c in last.index])
+    n = len(last)
+    # value/oss blocks side by side, then interleave: c0_value, c0_oss, c1_value, ...
+    pairs = np.column_stack([np.arange(n), np.arange(n) + n]).ravel()
+    defs = kpi_defs[["Category", "KPI", "Weight", "ID"]].reset_index(drop=True)
+    return pd.concat([defs, pd.concat([values, points], axis=1).iloc[:, pairs]], axis=1)
+
+
+def load_dataset(file_patterns=None, cache_dir=DEFAULT_CACHE_DIR, workers=DEFAULT_WORKERS, backend=DEFAULT_BACKEND, memo=None, profile=None):
+    """Load every workbook into a ``Dataset``.
+
+    Parsed workbooks are cached under ``cache_dir`` (pass None to disable), so
+    only workbooks whose fingerprint changed go through openpyxl again. With
+    ``workers`` > 1 (or ``BLINDSPOT_LOADER_WORKERS``) those workbooks are parsed
+    in parallel; the result is identical to the serial path. ``backend``
+    selects the parser: "pandas" reads whole sheets into DataFrames, "stream"
+    walks them row by row through openpyxl's read-only iterator. ``memo`` keeps
+    parsed workbooks in memory across calls (see ``load_workbooks``). Pass a
+    ``LoadProfile`` as ``profile`` to record per-stage timings; its summary is
+    logged when the load finishes.
+    """
+    if profile is None:
+        return _build_dataset(file_patterns, cache_dir, workers, backend, memo)
+    with profile.run():
+        dataset = _build_dataset(file_patterns, cache_dir, workers, backend, memo)
+    logger.info(profile.log_line())
+    return dataset
+
+
+def _build_dataset(file_patterns, cache_dir, workers, backend, memo):
+    companies = []
+    kpi_defs = []
+    sheets = []
+
+    files = [f for f in discover_files(file_patterns) if os.path.exists(f)]
+    for file_path, (file_sheets, error) in zip(files, load_workbooks(files, cache_dir, workers, backend, memo)):
+        if error is not None:
+            logger.error("Error processing file %s: %s", file_path, error)
+            continue
+        source_type = source_type_for(file_path)
+        for sheet in file_sheets:
+            with _stage("company_records") as stage:
+                companies.extend(company_records(sheet, source_type))
+                stage.scanned(len(sheet.kpi_ids), len(sheet.companies))
+            sheets.append(sheet)
+            # build kpi_definitions from first sheet encountered (if not present)
+            if not kpi_defs:
+                with _stage("kpi_definitions") as stage:
+                    kpi_defs = kpi_definitions(sheet)
+                    stage.scanned(len(kpi_defs), 3)
+
+    df_companies = pd.DataFrame(companies)
+    df_kpi_defs = pd.DataFrame(kpi_defs)
+    if not df_companies.empty and not df_kpi_defs.empty:
+        total_kpis = len(df_kpi_defs)
+        df_companies["Transparency_Percentage"] = (df_companies["Total_Missing_KPIs"] / total_kpis * 100).round(2)
+        df_companies["Present_Percentage"] = (100 - df_companies["Transparency_Percentage"]).round(2)
+        # Per company-year KPI vectors, in kpi_df order, for the KPI table, the matrix and the fact table.
+        kpi_codes = pd.Categorical(df_kpi_defs["ID"], categories=pd.unique(df_kpi_defs["ID"]))
+        aligned = [_aligned_sheet_arrays(sheet, kpi_codes, len(kpi_codes.categories)) for sheet in sheets]
+        missing = np.concatenate([m for m, _ in aligned])
+        oss = np.concatenate([o for _, o in aligned])
+
+        with _stage("pivot") as stage:
+            df_kpis = build_kpi_table(df_kpi_defs, df_companies["Company"], missing, oss)
+            stage.scanned(len(df_kpi_defs), len(df_companies))
+
+        with _stage("assembly") as stage:
+            df_companies = df_companies.drop_duplicates(subset=["Company", "Sector", "Type", "Year"], keep="first")
+            keep = df_companies.index.to_numpy()
+            df_companies = df_companies.reset_index(drop=True)
+            df_companies.insert(0, "entity_id", np.arange(len(df_companies)))
+            df_companies = compact_companies(df_companies)
+            matrix = MissingnessMatrix(missing[keep], df_kpi_defs["Weight"], df_kpi_defs["Category"])
+            stage.scanned(*matrix.shape)
+        return Dataset(df_companies, df_kpis, matrix, oss[keep].astype(np.float32))
+    return Dataset.empty()
+
+
+def load_data(file_patterns=None, cache_dir=DEFAULT_CACHE_DIR, workers=DEFAULT_WORKERS, backend=DEFAULT_BACKEND, profile=None):
+    """Load every workbook into ``(companies_df, kpi_df)``; see ``load_dataset``."""
+    dataset = load_dataset(file_patterns, cache_dir, workers, backend, profile=profile)
+    return dataset.companies, dataset.kpis
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load the KPI workbooks and report timings.")
+    parser.add_argument("patterns", nargs="*", help="Glob patterns of workbooks (default: datasets/)")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the parsed-workbook cache")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parser processes (0 = one per CPU)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=DEFAULT_BACKEND, help="Workbook parser")
+    parser.add_argument("--profile", nargs="?", const="-", metavar="FILE",
+                        help="Record per-stage timings and memory; print the JSON report (or write it to FILE)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    profile = LoadProfile() if args.profile else None
+    t0 = time.perf_counter()
+    companies_df, kpi_df = load_data(args.patterns or None, cache_dir=None if args.no_cache else DEFAULT_CACHE_DIR, workers=args.workers, backend=args.backend, profile=profile)
+    print(f"Loaded {len(companies_df)} company-years x {len(kpi_df)} KPIs in {time.perf_counter() - t0:.3f}s")
+    if profile is not None:
+        if args.profile == "-":
+            print(profile.to_json(indent=2))
+        else:
+            with open(args.profile, "w") as f:
+                f.write(profile.to_json(indent=2))
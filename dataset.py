@@ -0,0 +1,467 @@
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+
+# ---------------------
+# Company table schema
+# ---------------------
+# Compact dtypes for ``companies_df``: labels as categories (filters and
+# groupbys work on their integer codes), small ints for years and counts,
+# float32 for scores and percentages.
+COMPANY_SCHEMA = {
+    "entity_id": np.int32,
+    "Company": "category",
+    "Sector": "category",
+    "Type": "category",
+    "Year": np.int16,
+    "Total_Missing_KPIs": np.int16,
+    "Total_OSS_Score": np.float32,
+    "Transparency_Percentage": np.float32,
+    "Present_Percentage": np.float32,
+}
+
+
+def compact_companies(companies):
+    """``companies`` cast to ``COMPANY_SCHEMA`` (columns it lacks are left alone)."""
+    schema = {column: dtype for column, dtype in COMPANY_SCHEMA.items() if column in companies}
+    if "Year" in schema and companies["Year"].isna().any():
+        schema["Year"] = "Int16"
+    return companies.astype(schema)
+
+
+# ---------------------
+# KPI fact table
+# ---------------------
+class KpiFacts:
+    """Long-format KPI table with one row per (company-year entity, KPI).
+
+    Columns are ``entity_id, Company, Year, Type, KPI_ID, missing, oss``. Rows are
+    stored entity-major and dense (every entity has a row for every KPI, in
+    ``kpi_df`` order), so the rows of an entity or a KPI are found by offset
+    arithmetic instead of a search.
+    """
+
+    def __init__(self, frame, n_kpis):
+        self.frame = frame
+        self.n_kpis = n_kpis
+        self.kpi_ids = frame["KPI_ID"].cat.categories
+        codes = frame["KPI_ID"].cat.codes.to_numpy()[:n_kpis]
+        self._kpi_position = {}
+        for position, code in enumerate(codes):
+            self._kpi_position.setdefault(self.kpi_ids[code], position)
+
+    @classmethod
+    def build(cls, companies, kpi_ids, missing, oss):
+        """``missing``/``oss`` are (entity x KPI) arrays aligned with ``companies`` rows and ``kpi_ids``."""
+        n_entities, n_kpis = missing.shape
+        kpi_codes, kpi_categories = pd.factorize(pd.Index(kpi_ids))
+        company_codes, company_categories = pd.factorize(companies["Company"])
+        type_codes, type_categories = pd.factorize(companies["Type"])
+        frame = pd.DataFrame({
+            "entity_id": np.repeat(companies["entity_id"].to_numpy(dtype=np.int32), n_kpis),
+            "Company": pd.Categorical.from_codes(np.repeat(company_codes, n_kpis), company_categories),
+            "Year": pd.array(np.repeat(companies["Year"].to_numpy(dtype=float), n_kpis), dtype="Int16"),
+            "Type": pd.Categorical.from_codes(np.repeat(type_codes, n_kpis), type_categories),
+            "KPI_ID": pd.Categorical.from_codes(np.tile(kpi_codes, n_entities), kpi_categories),
+            "missing": np.asarray(missing, dtype=np.int8).ravel(),
+            "oss": np.asarray(oss, dtype=np.float32).ravel(),
+        })
+        return cls(frame, n_kpis)
+
+    def _entity_rows(self, entity_ids):
+        entity_ids = np.asarray(entity_ids, dtype=np.int64)
+        return (entity_ids[:, None] * self.n_kpis + np.arange(self.n_kpis)).ravel()
+
+    def for_entities(self, entity_ids):
+        """Fact rows of the given entities (``entity_id`` values of ``companies_df``)."""
+        return self.frame.iloc[self._entity_rows(entity_ids)]
+
+    def for_kpi(self, kpi_id):
+        """Fact rows of one KPI across all entities."""
+        return self.frame.iloc[self._kpi_position[kpi_id]::self.n_kpis]
+
+    def kpi_summary(self, entity_ids):
+        """Per-KPI missing count and OSS points lost over the given entities, indexed by KPI_ID."""
+        rows = self.for_entities(entity_ids)
+        points = rows["oss"].to_numpy(dtype=float) * rows["missing"].to_numpy()
+        summary = pd.DataFrame({
+            "KPI_ID": rows["KPI_ID"],
+            "missing": rows["missing"].to_numpy(dtype=np.int64),
+            "oss_points": points,
+        }).groupby("KPI_ID", observed=False).sum()
+        return summary
+
+
+# ---------------------
+# Missingness matrix
+# ---------------------
+class MissingnessMatrix:
+    """Dense (entity x KPI) ``uint8`` missing flags plus the KPI weight vector.
+
+    Row ``i`` is the company-year with ``entity_id == i``; column ``k`` is row
+    ``k`` of ``kpi_df``. Every aggregate is a reduction or a matrix-vector
+    product over the selected rows, which can be given as entity ids or a
+    boolean row mask (None = all rows).
+    """
+
+    def __init__(self, missing, weights, categories):
+        self.missing = np.ascontiguousarray(missing, dtype=np.uint8)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        codes, self.categories = pd.factorize(pd.Index(categories))
+        self.category_codes = codes
+        # (KPI x category) indicator, so category rollups are one product.
+        self._category_map = np.zeros((len(codes), len(self.categories)))
+        self._category_map[np.arange(len(codes)), codes] = 1.0
+        # (entity x category) missing weight, so category impact for any
+        # selection is a column sum over the selected rows.
+        self.category_weights = (self.missing * self.weights) @ self._category_map
+
+    @property
+    def shape(self):
+        return self.missing.shape
+
+    def select(self, rows=None):
+        if rows is None:
+            return self.missing
+        return self.missing[np.asarray(rows)]
+
+    def n_rows(self, rows=None):
+        if rows is None:
+            return self.missing.shape[0]
+        rows = np.asarray(rows)
+        return int(rows.sum()) if rows.dtype == bool else len(rows)
+
+    # Per entity
+    def total_oss(self, rows=None):
+        return self.select(rows) @ self.weights
+
+    def missing_counts(self, rows=None):
+        return self.select(rows).sum(axis=1, dtype=np.int64)
+
+    # Per KPI
+    def kpi_missing_counts(self, rows=None):
+        return self.select(rows).sum(axis=0, dtype=np.int64)
+
+    def kpi_missing_rates(self, rows=None):
+        n = self.n_rows(rows)
+        counts = self.kpi_missing_counts(rows)
+        return counts / n * 100 if n else np.zeros(len(counts))
+
+    def kpi_oss_points(self, rows=None):
+        return self.kpi_missing_counts(rows) * self.weights
+
+    def top_missing(self, rows=None, n=20):
+        """The ``n`` most-missed KPIs over the selected rows, plus summary figures, from one column reduction.
+
+        Only KPIs missed at least once are ranked; ties keep ``kpi_df`` order.
+        ``positions`` index ``kpi_df`` rows, most missed first.
+        """
+        n_rows = self.n_rows(rows)
+        counts = self.kpi_missing_counts(rows)
+        rates = counts / n_rows * 100 if n_rows else np.zeros(len(counts))
+        points = counts * self.weights
+        missed = np.flatnonzero(counts > 0)
+        # Distinct integer key per KPI: higher count first, earlier KPI first on a tie.
+        key = counts[missed] * len(counts) - missed
+        take = min(n, len(missed))
+        top = np.argpartition(-key, take - 1)[:take] if 0 < take < len(missed) else np.arange(take)
+        positions = missed[top[np.argsort(-key[top])]]
+        return {
+            "positions": positions,
+            "missing_count": counts[positions],
+            "missing_rate": rates[positions],
+            "oss_points": points[positions],
+            "unique_missing": len(missed),
+            "avg_missing_rate": float(rates[missed].mean()) if len(missed) else 0.0,
+            "max_missing": int(counts[positions[0]]) if take else 0,
+            "oss_impact": float(points[positions].sum()),
+        }
+
+    # Per category
+    def breakdown(self, rows=None):
+        """Missing rates (%) over the selected rows per KPI, per category and overall, from one column reduction."""
+        n = self.n_rows(rows)
+        counts = self.kpi_missing_counts(rows)
+        kpis_per_category = self._category_map.sum(axis=0)
+        if not n:
+            zeros = np.zeros(len(counts))
+            return {"n_rows": 0, "kpi_missing": counts, "kpi_rate": zeros,
+                    "category_rate": np.zeros(len(self.categories)), "overall_rate": 0.0}
+        return {
+            "n_rows": n,
+            "kpi_missing": counts,
+            "kpi_rate": counts / n * 100,
+            "category_rate": (counts @ self._category_map) / (kpis_per_category * n) * 100,
+            "overall_rate": counts.sum() / (len(counts) * n) * 100 if len(counts) else 0.0,
+        }
+
+    def category_missing_weight(self, rows=None):
+        """Missing KPI weight per category summed over the selected rows."""
+        weights = self.category_weights if rows is None else self.category_weights[np.asarray(rows)]
+        return weights.sum(axis=0)
+
+    def category_rollup(self, rows=None):
+        """Missing counts and weights per KPI category over the selected rows."""
+        n = self.n_rows(rows)
+        counts = self.kpi_missing_counts(rows)
+        rollup = pd.DataFrame({
+            "missing": counts @ self._category_map,
+            "possible": n * self._category_map.sum(axis=0),
+            "missing_weight": self.category_missing_weight(rows),
+            "possible_weight": n * (self.weights @ self._category_map),
+        }, index=self.categories)
+        rollup["missing_rate"] = _pct(rollup["missing"], rollup["possible"])
+        rollup["weighted_missing_rate"] = _pct(rollup["missing_weight"], rollup["possible_weight"])
+        return rollup
+
+
+def _pct(part, whole):
+    return (part / whole.where(whole > 0) * 100).fillna(0.0)
+
+
+# ---------------------
+# Bit-packed omission profiles
+# ---------------------
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(packed, axis=-1):
+    """Number of set bits in ``packed`` (uint8) summed along ``axis``."""
+    # numpy >= 2.0 has a native per-byte popcount; older versions use the table.
+    counts = np.bitwise_count(packed) if hasattr(np, "bitwise_count") else _POPCOUNT[packed]
+    return counts.sum(axis=axis, dtype=np.int64)
+
+
+class OmissionProfiles:
+    """Each entity's KPI omission vector packed 8 KPIs per byte.
+
+    Row ``i`` is the entity with ``entity_id == i`` and bit ``k`` is column ``k``
+    of the missingness matrix. Distances, intersections and diffs are bitwise
+    operations plus a popcount, so they run over whole populations at once.
+    """
+
+    # Upper bound on the (rows x rows x bytes) temporaries of pairwise distances.
+    CHUNK_BYTES = 1 << 24
+
+    def __init__(self, missing):
+        missing = np.asarray(missing)
+        self.n_kpis = missing.shape[1]
+        self.bits = np.packbits(missing.astype(bool), axis=1)
+
+    def _rows(self, rows):
+        return self.bits if rows is None else self.bits[np.asarray(rows)]
+
+    def unpack(self, packed):
+        return np.unpackbits(packed, axis=-1, count=self.n_kpis)
+
+    def omitted_counts(self, rows=None):
+        return popcount(self._rows(rows))
+
+    def _pairwise(self, a, b, reduce, dtype):
+        left, right = self._rows(a), self._rows(b)
+        out = np.empty((len(left), len(right)), dtype=dtype)
+        step = max(1, self.CHUNK_BYTES // max(1, right.size))
+        for start in range(0, len(left), step):
+            block = left[start:start + step, None, :]
+            out[start:start + step] = reduce(block, right[None, :, :])
+        return out
+
+    def hamming(self, a=None, b=None):
+        """Number of KPIs on which each entity in ``a`` differs from each in ``b`` (shape len(a) x len(b))."""
+        return self._pairwise(a, b, lambda x, y: popcount(x ^ y), np.int32)
+
+    def jaccard(self, a=None, b=None):
+        """Jaccard distance between omission sets; two entities omitting nothing are at distance 0."""
+        def distance(x, y):
+            union = popcount(x | y)
+            both = popcount(x & y)
+            return np.where(union > 0, 1 - both / np.maximum(union, 1), 0.0)
+        return self._pairwise(a, b, distance, np.float64)
+
+    def nearest(self, entity_id, k=5, rows=None):
+        """The ``k`` entities (from ``rows``, default all) whose omissions are closest in Hamming distance."""
+        candidates = np.arange(len(self.bits)) if rows is None else np.asarray(rows)
+        candidates = candidates[candidates != entity_id]
+        if not len(candidates):
+            return candidates, np.zeros(0, dtype=np.int64)
+        distances = popcount(self.bits[candidates] ^ self.bits[entity_id])
+        k = min(k, len(candidates))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top], kind="stable")]
+        return candidates[top], distances[top]
+
+    def both_omit(self, a, b):
+        """Positions of the KPIs omitted by both entity ``a`` and entity ``b``."""
+        return np.flatnonzero(self.unpack(self.bits[a] & self.bits[b]))
+
+    def common_omissions(self, rows=None):
+        """Positions of the KPIs omitted by every selected entity."""
+        selected = self._rows(rows)
+        if not len(selected):
+            return np.zeros(0, dtype=np.int64)
+        return np.flatnonzero(self.unpack(np.bitwise_and.reduce(selected, axis=0)))
+
+    def diff(self, a, b):
+        """XOR of two entities' profiles: KPIs newly omitted and newly disclosed going from ``a`` to ``b``."""
+        changed = self.bits[a] ^ self.bits[b]
+        return {
+            "omitted": np.flatnonzero(self.unpack(changed & self.bits[b])),
+            "disclosed": np.flatnonzero(self.unpack(changed & self.bits[a])),
+        }
+
+    def year_over_year(self, companies):
+        """One row per company and consecutive pair of years with how many KPIs changed status."""
+        ordered = companies.dropna(subset=["Year"]).sort_values(["Company", "Type", "Year"], kind="stable")
+        same = (ordered["Company"].to_numpy()[1:] == ordered["Company"].to_numpy()[:-1]) & (
+            ordered["Type"].to_numpy()[1:] == ordered["Type"].to_numpy()[:-1]
+        )
+        prev_ids = ordered["entity_id"].to_numpy()[:-1][same]
+        next_ids = ordered["entity_id"].to_numpy()[1:][same]
+        before, after = self.bits[prev_ids], self.bits[next_ids]
+        changed = before ^ after
+        return pd.DataFrame({
+            "Company": ordered["Company"].to_numpy()[1:][same],
+            "From_Year": ordered["Year"].to_numpy()[:-1][same],
+            "To_Year": ordered["Year"].to_numpy()[1:][same],
+            "Changed": popcount(changed),
+            "Newly_Omitted": popcount(changed & after),
+            "Newly_Disclosed": popcount(changed & before),
+        })
+
+
+# ---------------------
+# Filter index
+# ---------------------
+FILTER_DIMENSIONS = ("Year", "Type", "Sector", "Severity", "Company")
+
+
+class FilterIndex:
+    """Packed row bitsets per distinct value of the dashboard's filter columns.
+
+    Bit ``i`` refers to row position ``i`` of the companies table the index was
+    built from. A selection ORs the bitsets of the chosen values within a
+    dimension and ANDs the dimensions together; an empty selection does not
+    filter that dimension. Dimensions with many distinct values (Company at
+    scale) keep a sorted row list per value instead, turned into a bitset
+    only for the values a selection names.
+    """
+
+    # A bitset costs n_rows / 8 bytes per value; above this many values, row lists are smaller.
+    MAX_BITSET_VALUES = 256
+
+    def __init__(self, companies, dimensions=FILTER_DIMENSIONS):
+        self.n_rows = len(companies)
+        self.n_bytes = (self.n_rows + 7) // 8
+        self.dimensions = {}
+        for column in dimensions:
+            if column not in companies:
+                continue
+            codes, values = pd.factorize(companies[column], use_na_sentinel=True)
+            rows = np.flatnonzero(codes >= 0)
+            codes = codes[rows]
+            if len(values) <= self.MAX_BITSET_VALUES:
+                bitsets = np.zeros((len(values), self.n_bytes), dtype=np.uint8)
+                _set_bits(bitsets, rows, codes)
+                self.dimensions[column] = (pd.Index(values), bitsets, None)
+            else:
+                order = np.argsort(codes, kind="stable")
+                bounds = np.cumsum(np.bincount(codes, minlength=len(values)))[:-1]
+                self.dimensions[column] = (pd.Index(values), None, np.split(rows[order], bounds))
+        self._all = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def _dimension_bitset(self, column, values):
+        index, bitsets, row_lists = self.dimensions[column]
+        positions = index.get_indexer(list(values))
+        positions = positions[positions >= 0]
+        if bitsets is not None:
+            if not len(positions):
+                return np.zeros(self.n_bytes, dtype=np.uint8)
+            return np.bitwise_or.reduce(bitsets[positions], axis=0)
+        result = np.zeros(self.n_bytes, dtype=np.uint8)
+        if len(positions):
+            _set_bits(result, np.concatenate([row_lists[p] for p in positions]))
+        return result
+
+    def bitset(self, selections):
+        """Packed bitset of the rows matching ``selections`` ({column: values})."""
+        result = self._all.copy()
+        for column, values in selections.items():
+            if not values:
+                continue
+            if column not in self.dimensions:
+                return np.zeros_like(result)
+            result &= self._dimension_bitset(column, values)
+        return result
+
+    def mask(self, selections):
+        return np.unpackbits(self.bitset(selections), count=self.n_rows).astype(bool)
+
+    def rows(self, selections):
+        """Row positions (ascending) matching ``selections``."""
+        return np.flatnonzero(np.unpackbits(self.bitset(selections), count=self.n_rows))
+
+    def values(self, column):
+        return self.dimensions[column][0]
+
+
+def _set_bits(bitsets, rows, which=None):
+    """Set bit ``rows[i]`` in packed ``bitsets`` (row ``which[i]`` of it when 2-D), in np.packbits bit order."""
+    bits = np.left_shift(1, 7 - (rows & 7)).astype(np.uint8)
+    target = (rows >> 3,) if which is None else (which, rows >> 3)
+    np.bitwise_or.at(bitsets, target, bits)
+
+
+# ---------------------
+# Dataset
+# ---------------------
+@dataclass(frozen=True)
+class Dataset:
+    """Everything the dashboard reads: company-years, KPI definitions, the missingness matrix and per-KPI OSS points.
+
+    Datasets are snapshots: fields are never reassigned and ``freeze`` makes
+    the arrays read-only, so a callback holding one sees consistent data while
+    a reload publishes the next ``version``. ``index`` is the ``FilterIndex``
+    over ``companies`` as frozen. ``source_key`` identifies the workbook
+    contents the snapshot was built from and, unlike ``version``, is the same
+    in every process that loaded the same files. ``oss`` is the (entity x KPI)
+    OSS points array aligned with ``matrix``. The KPI fact table and the
+    omission profiles are derived views, built on first access rather than on
+    every load.
+    """
+    companies: pd.DataFrame
+    kpis: pd.DataFrame
+    matrix: MissingnessMatrix
+    oss: np.ndarray
+    version: int = 0
+    index: FilterIndex = None
+    source_key: str = ""
+
+    def freeze(self, version, source_key=""):
+        """This dataset tagged ``version`` and indexed, with its arrays locked against writes."""
+        index = FilterIndex(self.companies)
+        for array in (self.matrix.missing, self.matrix.weights, self.matrix.category_weights, self.oss):
+            array.flags.writeable = False
+        return replace(self, version=version, index=index, source_key=source_key)
+
+    @cached_property
+    def facts(self):
+        """Long-format ``KpiFacts`` over ``companies``, built on first access."""
+        companies = self.companies
+        if companies.empty:
+            companies = pd.DataFrame({"entity_id": [], "Company": [], "Type": [], "Year": []})
+        return KpiFacts.build(companies, self.kpis.get("ID", []), self.matrix.missing, self.oss)
+
+    @cached_property
+    def profiles(self):
+        """Bit-packed ``OmissionProfiles`` of ``matrix``, built on first access."""
+        profiles = OmissionProfiles(self.matrix.missing)
+        profiles.bits.flags.writeable = False
+        return profiles
+
+    @classmethod
+    def empty(cls):
+        missing = np.zeros((0, 0), dtype=np.uint8)
+        return cls(pd.DataFrame(), pd.DataFrame(), MissingnessMatrix(missing, [], []), np.zeros((0, 0), dtype=np.float32))
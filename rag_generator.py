@@ -81,7 +81,7 @@ class BlindSpotRAG:
         # Add year distribution if available
         if "Year" in df.columns and df["Year"].nunique() > 0:
             year_counts = df["Year"].value_counts().sort_index()
-            context_parts.append(f"Years covered: {', '.join(map(str, sorted(df['Year'].unique())))}")
+            context_parts.append(f"Years covered: {', '.join(map(str, sorted(df['Year'].dropna().unique())))}")
             for year, count in year_counts.items():
                 context_parts.append(f"  - Year {year}: {count} entries")
         
@@ -94,6 +94,7 @@ class BlindSpotRAG:
         
         context_parts.append("\n=== SEVERITY DISTRIBUTION ===")
         severity_counts = df["Severity"].value_counts()
+        severity_counts = severity_counts[severity_counts > 0]
         for severity, count in severity_counts.items():
             pct = (count / len(df) * 100)
             if severity == "N/A":
@@ -103,13 +104,13 @@ class BlindSpotRAG:
         
         if "Sector" in df.columns and df["Sector"].nunique() > 0:
             context_parts.append("\n=== SECTOR DISTRIBUTION ===")
-            sector_stats = df_with_data.groupby("Sector")["Total_OSS_Score"].agg(['count', 'mean', 'min', 'max']) if len(df_with_data) > 0 else pd.DataFrame()
+            sector_stats = df_with_data.groupby("Sector", observed=True)["Total_OSS_Score"].agg(['count', 'mean', 'min', 'max']) if len(df_with_data) > 0 else pd.DataFrame()
             for sector, row in sector_stats.iterrows():
                 context_parts.append(f"{sector}: {int(row['count'])} entries, avg OSS: {row['mean']:.2f}")
         
         if "Type" in df.columns and df["Type"].nunique() > 0:
             context_parts.append("\n=== COMPANY TYPE DISTRIBUTION ===")
-            type_stats = df_with_data.groupby("Type")["Total_OSS_Score"].agg(['count', 'mean']) if len(df_with_data) > 0 else pd.DataFrame()
+            type_stats = df_with_data.groupby("Type", observed=True)["Total_OSS_Score"].agg(['count', 'mean']) if len(df_with_data) > 0 else pd.DataFrame()
             for comp_type, row in type_stats.iterrows():
                 context_parts.append(f"{comp_type}: {int(row['count'])} entries, avg OSS: {row['mean']:.2f}")
         
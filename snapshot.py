@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from data_loader import (
+    DEFAULT_BACKEND, DEFAULT_CACHE_DIR, DEFAULT_WORKERS, LoadProfile, discover_files, file_stamp, load_dataset,
+)
+from dataset import Dataset
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of datasets/ for changed workbooks (0 disables the watcher).
+DEFAULT_RELOAD_INTERVAL = float(os.environ.get("BLINDSPOT_RELOAD_INTERVAL", "10"))
+# Record a per-stage LoadProfile for every (re)load: "1" = timings, "memory" = timings + tracemalloc.
+PROFILE_LOADS = os.environ.get("BLINDSPOT_PROFILE_LOADS", "")
+
+
+# ---------------------
+# Dataset store
+# ---------------------
+class DatasetStore:
+    """Holds the current ``Dataset`` snapshot and swaps in a new one when workbooks change.
+
+    Callbacks call ``current()`` once and work on that object only. A reload
+    builds the next snapshot on the side and publishes it with a single
+    reference assignment, so requests already running keep the snapshot they
+    started with and later requests see the new one; nothing is ever half
+    updated. Workbooks whose size and mtime did not change are reused from
+    memory, so only changed files are parsed again.
+    """
+
+    def __init__(self, file_patterns=None, prepare=None, cache_dir=DEFAULT_CACHE_DIR,
+                 workers=DEFAULT_WORKERS, backend=DEFAULT_BACKEND, profile_loads=PROFILE_LOADS, watch_interval=None):
+        self.file_patterns = file_patterns
+        self.watch_interval = watch_interval
+        self.profile_loads = profile_loads
+        self.last_profile = None
+        self.prepare = prepare
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.backend = backend
+        self._memo = {}
+        self._reload_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._watcher = None
+        self._snapshot = None
+
+    def current(self):
+        """The current snapshot, loaded on first use.
+
+        The first call also starts the watcher when ``watch_interval`` is set,
+        so importing the app (e.g. in a spawned worker process) never parses
+        workbooks or starts threads.
+        """
+        if self._snapshot is None:
+            with self._start_lock:
+                if self._snapshot is None:
+                    self.reload()
+                    if self.watch_interval:
+                        self.watch(self.watch_interval)
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self.current().version
+
+    def _stamps(self):
+        stamps = {}
+        for file_path in discover_files(self.file_patterns):
+            try:
+                stamps[file_path] = file_stamp(file_path)
+            except OSError:
+                continue
+        return stamps
+
+    def _source_key(self):
+        # Same files with the same stamps give the same key in every worker process.
+        stamps = sorted((os.path.abspath(path), stamp) for path, (stamp, _, _) in self._memo.items())
+        return hashlib.sha1(repr(stamps).encode("utf-8")).hexdigest()
+
+    def changed_files(self):
+        """Workbooks added, modified or removed since the current snapshot was built."""
+        stamps = self._stamps()
+        known = {file_path: stamp for file_path, (stamp, _, _) in self._memo.items()}
+        return sorted(path for path in set(stamps) | set(known) if stamps.get(path) != known.get(path))
+
+    def reload(self):
+        """Build a new snapshot from disk and publish it; on failure the current one stays."""
+        with self._reload_lock:
+            t0 = time.perf_counter()
+            profile = LoadProfile(trace_memory=self.profile_loads == "memory") if self.profile_loads else None
+            try:
+                dataset = load_dataset(self.file_patterns, self.cache_dir, self.workers, self.backend,
+                                       memo=self._memo, profile=profile)
+                if self.prepare is not None:
+                    dataset = self.prepare(dataset)
+            except Exception:
+                logger.exception("Error reloading datasets")
+                if self._snapshot is None:
+                    # Serve an empty dataset until a later reload succeeds.
+                    self._snapshot = Dataset.empty().freeze(0)
+                return self._snapshot
+            if profile is not None:
+                self.last_profile = profile.report()
+            version = self._snapshot.version + 1 if self._snapshot is not None else 1
+            self._snapshot = dataset.freeze(version, self._source_key())
+            logger.info("dataset v%d: %d company-years x %d KPIs in %.3fs",
+                        version, len(dataset.companies), len(dataset.kpis), time.perf_counter() - t0)
+            return self._snapshot
+
+    def refresh(self):
+        """Reload if any workbook changed; returns True when a new snapshot was published."""
+        changed = self.changed_files()
+        if not changed:
+            return False
+        logger.info("reloading, changed workbooks: %s", ", ".join(os.path.basename(p) for p in changed))
+        before = self._snapshot
+        return self.reload() is not before
+
+    # Watcher
+    def watch(self, interval=DEFAULT_RELOAD_INTERVAL):
+        """Poll for changed workbooks every ``interval`` seconds on a daemon thread."""
+        if interval <= 0 or self._watcher is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    logger.exception("Error checking datasets for changes")
+
+        thread = threading.Thread(target=run, name="dataset-watcher", daemon=True)
+        self._watcher = (thread, stop)
+        thread.start()
+
+    def stop(self):
+        if self._watcher is not None:
+            thread, stop = self._watcher
+            stop.set()
+            thread.join()
+            self._watcher = None
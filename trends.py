@@ -0,0 +1,99 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+SCORE = "Total_OSS_Score"
+
+
+# ---------------------
+# Trend engine
+# ---------------------
+def multi_year(companies):
+    """Rows of companies reported in more than one year, sorted by company then year.
+
+    Rows without a year (sheets whose year could not be parsed) are left out.
+    """
+    companies = companies[companies["Year"].notna()]
+    n_years = companies.groupby("Company", observed=True)["Year"].transform("nunique")
+    return companies[n_years > 1].sort_values(["Company", "Year"], kind="stable")
+
+
+def year_intervals(years):
+    """Every (earlier, later) pair of the years present, ordered by start year then end year."""
+    return list(itertools.combinations(sorted({int(y) for y in pd.Series(years).dropna()}), 2))
+
+
+def company_trends(trend_df):
+    """First/last year, OSS change and average annual change per company of ``multi_year`` rows.
+
+    Companies whose first or last OSS is 0 (no scored data) are left out.
+    """
+    first = trend_df.drop_duplicates("Company", keep="first")
+    last = trend_df.drop_duplicates("Company", keep="last")
+    start, end = first[SCORE].to_numpy(np.float64), last[SCORE].to_numpy(np.float64)
+    span = last["Year"].to_numpy(np.float64) - first["Year"].to_numpy(np.float64)
+    change = end - start
+    keep = (start != 0) & (end != 0)
+
+    stats = pd.DataFrame({
+        "Company": first["Company"].to_numpy(),
+        "Start Year": first["Year"].to_numpy(np.int64),
+        "End Year": last["Year"].to_numpy(np.int64),
+        "Start OSS": start,
+        "End OSS": end,
+        "Change": change,
+        "Avg Annual Change": np.divide(change, span, out=np.zeros_like(change), where=span > 0),
+        "Direction": np.select([change < 0, change > 0], ["↓ Improving", "↑ Worsening"], "→ Stable"),
+        "Start Severity": first["Severity"].to_numpy(),
+        "End Severity": last["Severity"].to_numpy(),
+    })
+    return stats[keep].reset_index(drop=True)
+
+
+def interval_movers(trend_df, intervals=None):
+    """Most improved and most worsened company for every year interval, in one pass.
+
+    Builds a (company x year) OSS grid from each company's last row per year,
+    takes the change over all intervals at once and reduces each interval
+    column to its best and worst mover. Returns one dict per interval with
+    ``label``, ``improve`` and ``worsen`` (None when nobody moved that way).
+    """
+    if intervals is None:
+        intervals = year_intervals(trend_df["Year"])
+    rows = trend_df.drop_duplicates(["Company", "Year"], keep="last")
+    company_codes, company_names = pd.factorize(rows["Company"])
+    years = np.array(sorted({int(y) for y in rows["Year"].dropna()}), dtype=np.int64)
+    present = rows["Year"].notna().to_numpy()
+    year_codes = np.searchsorted(years, rows["Year"].to_numpy(np.float64)[present].astype(np.int64))
+
+    # (company x year) score grid; 0 counts as unscored, like in company_trends.
+    scores = np.full((len(company_names), len(years)), np.nan)
+    scores[company_codes[present], year_codes] = rows[SCORE].to_numpy(np.float64)[present]
+    scores[scores == 0] = np.nan
+    severity = np.empty(scores.shape, dtype=object)
+    severity[company_codes[present], year_codes] = rows["Severity"].to_numpy()[present]
+
+    summaries = [{"label": f"{start} - {end}", "improve": None, "worsen": None} for start, end in intervals]
+    usable = [i for i, (start, end) in enumerate(intervals) if start in years and end in years]
+    if not usable or not len(company_names):
+        return summaries
+    start_col = np.searchsorted(years, [intervals[i][0] for i in usable])
+    end_col = np.searchsorted(years, [intervals[i][1] for i in usable])
+    deltas = scores[:, end_col] - scores[:, start_col]
+    valid = ~np.isnan(deltas)
+
+    # Ties go to the first company for the best mover and the last for the worst.
+    best = np.where(valid, deltas, np.inf).argmin(axis=0)
+    worst = len(company_names) - 1 - np.where(valid, deltas, -np.inf)[::-1].argmax(axis=0)
+    for col, i in enumerate(usable):
+        for key, row, moved in (("improve", best[col], deltas[best[col], col] < 0),
+                                ("worsen", worst[col], deltas[worst[col], col] > 0)):
+            if moved:
+                summaries[i][key] = {
+                    "Company": company_names[row],
+                    "Change": deltas[row, col],
+                    "StartSeverity": severity[row, start_col[col]],
+                    "EndSeverity": severity[row, end_col[col]],
+                }
+    return summaries